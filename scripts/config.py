@@ -12,6 +12,19 @@ DATA_DIR.mkdir(exist_ok=True)
 
 # Amazon Kindle URL (amazon.cn service has been discontinued)
 KINDLE_HISTORY_URL = "https://www.amazon.com/kindle/reading/insights/data"
+KINDLE_INSIGHTS_PATH = "/kindle/reading/insights/data"
+
+# 多个商城（逗号分隔）一起同步，例如从 amazon.cn 迁移过来的历史
+KINDLE_MARKETPLACES = [
+    url.strip().rstrip("/")
+    for url in os.environ.get("KINDLE_MARKETPLACES", "https://www.amazon.com").split(",")
+    if url.strip()
+]
+
+# 单向历图片源（可通过环境变量指向本地替身服务器）
+DAILY_CALENDAR_BASE_URL = os.environ.get(
+    "DAILY_CALENDAR_BASE_URL", "https://img.owspace.com/Public/uploads/Download"
+).rstrip("/")
 
 # Headers for requests
 KINDLE_HEADER = {
@@ -20,6 +33,49 @@ KINDLE_HEADER = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# Persisted login session, reused across runs; kept outside the repo so it is never committed or deployed
+SESSION_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "reading_page"
+KINDLE_SESSION_FILE = Path(os.environ.get("KINDLE_SESSION_FILE", SESSION_CACHE_DIR / "kindle_session.json"))
+KINDLE_PROBE_TIMEOUT = 10
+
 # Data file paths
-KINDLE_DATA_FILE = DATA_DIR / "kindle_data.json"
+KINDLE_DATA_FILE = DATA_DIR / "kindle_data.json"  # only the fields the pipeline reads
+KINDLE_RAW_ARCHIVE = DATA_DIR / "kindle_data.raw.json.gz"  # optional full payload (--archive-raw)
 READING_DATA_FILE = DATA_DIR / "reading_data.json"
+
+# Cached daily calendar images (gen_page.py --cache-calendar)
+CALENDAR_CACHE_DIR = DATA_DIR / "calendar"
+CALENDAR_IMAGE_WIDTH = 680  # 2x the calendar column width
+
+# Team page (team_page.py): one <name>.json reading history per member
+USERS_DIR = DATA_DIR / "users"
+TEAM_PAGE_FILE = BASE_DIR / "team.html"
+TEAM_LEADERBOARD_SIZE = 10
+
+# Local importers (kindle_sync.py --koreader / --calibre)
+KOREADER_MIN_SECONDS = 60  # 少于 1 分钟的阅读不计入
+
+# Page variants rendered by gen_page.py: (language, theme)
+DEFAULT_LANG = "zh"
+DEFAULT_THEME = "kindle"
+PAGE_VARIANTS = [(DEFAULT_LANG, DEFAULT_THEME)]
+
+# Long-range heatmap (gen_page.py --years): cell granularity by range length in days
+LONG_RANGE_DAY_LIMIT = 400
+LONG_RANGE_WEEK_LIMIT = 366 * 5
+
+# Page weight budget checked after generation (gen_page.py)
+PAGE_BUDGET_FILE = BASE_DIR / "page_budget.json"
+
+# Sync daemon (sync_daemon.py): many accounts in one long-running process
+DAEMON_ACCOUNTS_FILE = BASE_DIR / "accounts.json"
+ACCOUNTS_DATA_DIR = DATA_DIR / "accounts"  # raw Kindle data per account
+SESSIONS_DIR = SESSION_CACHE_DIR / "sessions"  # login session per account
+DAEMON_REQUEST_RATE = 0.5  # requests per second, shared by all accounts
+DAEMON_REQUEST_BURST = 5
+DAEMON_BASE_INTERVAL = 6 * 3600
+DAEMON_MAX_INTERVAL = 48 * 3600
+DAEMON_RETRY_DELAY = 300
+
+# Static JSON API (gen_page.py): api/v1/manifest.json + hashed per-year shards
+API_DIR = BASE_DIR / "api"
@@ -0,0 +1,178 @@
+"""Export reading days to ICS, CSV and JSON Lines"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from config import READING_DATA_FILE
+
+
+# 只扫描 reading_days 对象内部："sources" 等其他字段里的日期键不会被误读
+DAYS_START = re.compile(r'"reading_days"\s*:\s*\{')
+DAY_ENTRY = re.compile(r'"(\d{4}-\d{2}-\d{2})"\s*:\s*(\d+)')
+CHUNK_SIZE = 64 * 1024
+
+
+def _iter_days_object(f):
+    """Yield the text of the reading_days object chunk by chunk, up to its closing brace"""
+    buf = ""
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        buf += chunk
+        m = DAYS_START.search(buf)
+        if m:
+            buf = buf[m.end():]
+            break
+        if not chunk:
+            raise ValueError("No reading_days object found")
+        buf = buf[-64:]
+
+    while True:
+        # reading_days 的值都是整数，第一个右括号就是对象的结尾
+        close = buf.find("}")
+        if close != -1:
+            yield buf[:close], True
+            return
+        if not chunk:
+            raise ValueError("Unterminated reading_days object")
+        yield buf, False
+        chunk = f.read(CHUNK_SIZE)
+        buf = chunk
+
+
+def iter_reading_days(path=READING_DATA_FILE, since=None):
+    """
+    Stream (date, value) pairs from a reading data file without loading it.
+
+    Only the reading_days object is scanned, in fixed-size chunks, so memory
+    stays constant however long the history is. Days on or before `since`
+    (a date) are skipped. Raises ValueError if the days are not in date order,
+    which iter_streaks relies on.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tail = ""
+        prev = None
+        for chunk, last in _iter_days_object(f):
+            buf = tail + chunk
+            end = 0
+            for m in DAY_ENTRY.finditer(buf):
+                # 匹配可能被块边界截断，留到下一块再处理
+                if not last and m.end() == len(buf):
+                    break
+                end = m.end()
+                day = date.fromisoformat(m.group(1))
+                if prev is not None and day <= prev:
+                    raise ValueError(f"reading_days not in date order: {day} after {prev}")
+                prev = day
+                if since is None or day > since:
+                    yield day, int(m.group(2))
+            tail = buf[max(end, len(buf) - 64):]
+
+
+def iter_streaks(days):
+    """Merge consecutive days into (start, end) ranges, end inclusive"""
+    start = prev = None
+    for day, _ in days:
+        if prev is not None and day == prev + timedelta(days=1):
+            prev = day
+            continue
+        if start is not None:
+            yield start, prev
+        start = prev = day
+    if start is not None:
+        yield start, prev
+
+
+def write_ics(days, out, merge_streaks=True):
+    """Write all-day VEVENTs, one per streak (or per day)"""
+    ranges = iter_streaks(days) if merge_streaks else ((d, d) for d, _ in days)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    out.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//reading_page//export//EN\r\nCALSCALE:GREGORIAN\r\n")
+    count = 0
+    for start, end in ranges:
+        length = (end - start).days + 1
+        summary = "📚 Reading" if length == 1 else f"📚 Reading streak ({length} days)"
+        out.write(
+            "BEGIN:VEVENT\r\n"
+            f"UID:reading-{start.isoformat()}@reading_page\r\n"
+            f"DTSTAMP:{stamp}\r\n"
+            f"DTSTART;VALUE=DATE:{start.strftime('%Y%m%d')}\r\n"
+            f"DTEND;VALUE=DATE:{(end + timedelta(days=1)).strftime('%Y%m%d')}\r\n"
+            f"SUMMARY:{summary}\r\n"
+            "TRANSP:TRANSPARENT\r\n"
+            "END:VEVENT\r\n"
+        )
+        count += 1
+    out.write("END:VCALENDAR\r\n")
+    return count
+
+
+def write_csv(days, out, header=True):
+    """Write one `date,value` row per reading day"""
+    if header:
+        out.write("date,value\n")
+    count = 0
+    for day, value in days:
+        out.write(f"{day.isoformat()},{value}\n")
+        count += 1
+    return count
+
+
+def write_jsonl(days, out):
+    """Write one JSON object per reading day"""
+    count = 0
+    for day, value in days:
+        out.write(json.dumps({"date": day.isoformat(), "value": value}) + "\n")
+        count += 1
+    return count
+
+
+WRITERS = {
+    "ics": write_ics,
+    "csv": write_csv,
+    "jsonl": write_jsonl,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export reading days from the stored history")
+    parser.add_argument("format", choices=sorted(WRITERS), help="Export format")
+    parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    parser.add_argument("--input", default=READING_DATA_FILE, help="Reading data file")
+    parser.add_argument("--since", type=date.fromisoformat, help="Only export days after this date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Append to the output file instead of overwriting (csv/jsonl incremental export)",
+    )
+    args = parser.parse_args()
+
+    if args.append and (args.format == "ics" or not args.output):
+        print("Error: --append needs an output file and a csv or jsonl format", file=sys.stderr)
+        return False
+
+    days = iter_reading_days(args.input, since=args.since)
+    out = open(args.output, "a" if args.append else "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            count = write_csv(days, out, header=not (args.append and out.tell() > 0))
+        else:
+            count = WRITERS[args.format](days, out)
+    except ValueError as e:
+        print(f"Error: {args.input}: {e}", file=sys.stderr)
+        return False
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    unit = "events" if args.format == "ics" else "days"
+    print(f"✅ Exported {count} {unit} as {args.format}", file=sys.stderr)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -1,10 +1,89 @@
 """Generate Kindle reading page with Daily Calendar integration"""
 
+import argparse
+import hashlib
+import io
 import json
 import os
-from datetime import datetime, timedelta
+from array import array
+from datetime import date, datetime, timedelta
 
-from config import DATA_DIR, READING_DATA_FILE
+import requests
+from PIL import Image
+
+from config import (
+    DATA_DIR,
+    READING_DATA_FILE,
+    DAILY_CALENDAR_BASE_URL,
+    CALENDAR_CACHE_DIR,
+    CALENDAR_IMAGE_WIDTH,
+    DEFAULT_LANG,
+    DEFAULT_THEME,
+    PAGE_VARIANTS,
+    LONG_RANGE_DAY_LIMIT,
+    LONG_RANGE_WEEK_LIMIT,
+    PAGE_BUDGET_FILE,
+    API_DIR,
+)
+from page_budget import BudgetConfigError, BudgetExceededError, check_page_budget
+from static_api import build_static_api
+
+
+# 页面文案，按语言区分；模板只引用这里的 key
+LABELS = {
+    "zh": {
+        "html_lang": "zh-CN",
+        "description": "我的阅读记录 - Kindle 风格",
+        "title": "阅读记录",
+        "unit": "天",
+        "loading": "加载中...",
+        "calendar_alt": "单向历",
+        "calendar_date": "{y} 年 {m} 月 {n} 日",
+        "heatmap_title": "全年阅读活动",
+        "heatmap_subtitle": "过去一年共阅读 {days} 天",
+        "read_mark": "已阅读",
+        "long_heatmap_title": "历年阅读活动",
+        "long_heatmap_subtitle": "{start} 至今共阅读 {days} 天",
+    },
+    "en": {
+        "html_lang": "en",
+        "description": "My reading journal - Kindle style",
+        "title": "Reading Journal",
+        "unit": "days",
+        "loading": "Loading...",
+        "calendar_alt": "Daily calendar",
+        "calendar_date": "{y}-{m}-{n}",
+        "heatmap_title": "Reading Activity",
+        "heatmap_subtitle": "{days} reading days this year",
+        "read_mark": "Read",
+        "long_heatmap_title": "Reading History",
+        "long_heatmap_subtitle": "{days} reading days since {start}",
+    },
+}
+
+# 配色方案，对应 :root 中的 CSS 变量
+THEMES = {
+    "kindle": {
+        "--bg-primary": "#f4f1ea",
+        "--bg-secondary": "#ffffff",
+        "--text-primary": "#1a1a1a",
+        "--text-secondary": "#666666",
+        "--text-tertiary": "#999999",
+        "--border-color": "#d4d4d4",
+        "--accent": "#1a1a1a",
+        "--shadow": "0 1px 3px rgba(0, 0, 0, 0.08)",
+    },
+    "dark": {
+        "--bg-primary": "#1c1c1e",
+        "--bg-secondary": "#2a2a2c",
+        "--text-primary": "#e8e4da",
+        "--text-secondary": "#a8a49c",
+        "--text-tertiary": "#7a776f",
+        "--border-color": "#3d3d40",
+        "--accent": "#e8e4da",
+        "--shadow": "0 1px 3px rgba(0, 0, 0, 0.4)",
+    },
+}
 
 
 def load_reading_data():
@@ -16,62 +95,29 @@ def load_reading_data():
         return json.load(f)
 
 
-def calculate_stats(reading_days):
-    """Calculate reading statistics"""
-    if not reading_days:
-        return {
-            "total_days": 0,
-            "this_year_days": 0,
-            "current_streak": 0,
-            "longest_streak": 0,
-            "this_month_days": 0
-        }
-    
-    total_days = len(reading_days)
-    current_year = datetime.now().year
-    this_year_days = len([d for d in reading_days.keys() if d.startswith(str(current_year))])
-    current_month = datetime.now().strftime("%Y-%m")
-    this_month_days = len([d for d in reading_days.keys() if d.startswith(current_month)])
+def calculate_stats(reading_days, today=None):
+    """
+    Calculate reading statistics.
+
+    Days after today are ignored, and a streak still counts as current if the
+    last reading day was yesterday; team_page.calculate_group_stats matches this.
+    """
+    today = today or date.today()
+    days = sorted(d for d in map(date.fromisoformat, reading_days) if d <= today)
     
-    sorted_dates = sorted(reading_days.keys(), reverse=True)
-    current_streak = 0
     longest_streak = 0
-    temp_streak = 1
-    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    for i, date_str in enumerate(sorted_dates):
-        current_date = datetime.strptime(date_str, "%Y-%m-%d")
-        
-        if i == 0:
-            days_diff = (today - current_date).days
-            if days_diff <= 1:
-                current_streak = 1
-                temp_streak = 1
-            else:
-                current_streak = 0
-                temp_streak = 1
-        else:
-            prev_date = datetime.strptime(sorted_dates[i-1], "%Y-%m-%d")
-            days_diff = (prev_date - current_date).days
-            
-            if days_diff == 1:
-                temp_streak += 1
-                if current_streak > 0:
-                    current_streak = temp_streak
-            else:
-                longest_streak = max(longest_streak, temp_streak)
-                if current_streak == 0:
-                    temp_streak = 1
-                else:
-                    current_streak = 0
-                    temp_streak = 1
-    
-    longest_streak = max(longest_streak, temp_streak, current_streak)
+    streak = 0
+    prev = None
+    for day in days:
+        streak = streak + 1 if prev is not None and (day - prev).days == 1 else 1
+        longest_streak = max(longest_streak, streak)
+        prev = day
+    current_streak = streak if days and (today - days[-1]).days <= 1 else 0
     
     return {
-        "total_days": total_days,
-        "this_year_days": this_year_days,
-        "this_month_days": this_month_days,
+        "total_days": len(days),
+        "this_year_days": len([d for d in days if d.year == today.year]),
+        "this_month_days": len([d for d in days if (d.year, d.month) == (today.year, today.month)]),
         "current_streak": current_streak,
         "longest_streak": longest_streak
     }
@@ -126,9 +172,292 @@ def generate_month_labels(weeks):
     return months
 
 
-def generate_html(reading_data, output_file="index.html"):
-    """Generate HTML page with stats, daily calendar, and heatmap"""
+# 长时间范围热力图：每列的格子数（按周、按季度、按年）
+LONG_RANGE_ROWS = {"day": 7, "week": 13, "month": 12}
+
+
+def build_day_index(reading_days, start, end):
+    """
+    Aggregate index over [start, end]: prefix[i] is the number of reading days
+    before start + i, so any range count is a single subtraction.
+    """
+    span = (end - start).days + 1
+    marks = bytearray(span)
+    for date_str in reading_days:
+        offset = (date.fromisoformat(date_str) - start).days
+        if 0 <= offset < span:
+            marks[offset] = 1
+    
+    prefix = array("I", [0]) * (span + 1)
+    total = 0
+    for i, mark in enumerate(marks):
+        total += mark
+        prefix[i + 1] = total
+    return prefix
+
+
+def choose_granularity(range_days):
+    """Pick day, week or month cells so the heatmap stays a bounded size"""
+    if range_days <= LONG_RANGE_DAY_LIMIT:
+        return "day"
+    if range_days <= LONG_RANGE_WEEK_LIMIT:
+        return "week"
+    return "month"
+
+
+def generate_long_range_heatmap(reading_days, years=None, today=None):
+    """
+    Roll reading days up into day, week or month cells over a long range.
+
+    years=None covers the whole history. Cells are encoded as one base-36 digit
+    (the reading-day count) per cell, "-" for future cells, so the page carries
+    a short string instead of one DOM node per day.
+    """
+    today = today or date.today()
+    if years:
+        # 2 月 29 日往前推到非闰年时取 2 月 28 日
+        day = min(today.day, 28) if today.month == 2 else today.day
+        start = today.replace(year=today.year - years, day=day) + timedelta(days=1)
+    elif reading_days:
+        start = date.fromisoformat(min(reading_days))
+    else:
+        start = today
+    
+    since = start
+    granularity = choose_granularity((today - start).days + 1)
+    if granularity == "day":
+        start -= timedelta(days=start.weekday())
+    elif granularity == "week":
+        start = date(start.year, 1, 1)
+        start -= timedelta(days=start.weekday())
+    else:
+        start = date(start.year, 1, 1)
+    
+    prefix = build_day_index(reading_days, start, today)
+    
+    def count(cell_start, cell_end):
+        lo = (cell_start - start).days
+        hi = min((cell_end - start).days, len(prefix) - 1)
+        return prefix[hi] - prefix[lo]
+    
+    rows = LONG_RANGE_ROWS[granularity]
+    cells = []
+    labels = []
+    cell_start = start
+    last_label = None
+    while cell_start <= today or len(cells) % rows:
+        if granularity == "day":
+            cell_end = cell_start + timedelta(days=1)
+            label = cell_start.strftime("%b")
+        elif granularity == "week":
+            cell_end = cell_start + timedelta(days=7)
+            label = str((cell_start + timedelta(days=6)).year)
+        else:
+            cell_end = date(cell_start.year + cell_start.month // 12, cell_start.month % 12 + 1, 1)
+            label = str(cell_start.year)
+        
+        if len(cells) % rows == 0 and label != last_label:
+            labels.append([len(cells) // rows, label])
+            last_label = label
+        
+        cells.append("-" if cell_start > today else "0123456789abcdefghijklmnopqrstuvwxyz"[count(cell_start, cell_end)])
+        cell_start = cell_end
+    
+    return {
+        "granularity": granularity,
+        "rows": rows,
+        "columns": len(cells) // rows,
+        "start": start.isoformat(),
+        "since": since.isoformat(),
+        "cells": "".join(cells),
+        "labels": labels,
+        "total_days": prefix[-1] - prefix[(since - start).days],
+    }
+
+
+LONG_RANGE_CSS = """        .long-heatmap {
+            overflow-x: auto;
+            padding: 1rem 0;
+        }
+        
+        .long-heatmap-track {
+            position: relative;
+        }
+        
+        .long-heatmap-labels span {
+            position: absolute;
+            top: 0;
+            font-size: 0.75rem;
+            color: var(--text-tertiary);
+            font-family: 'Helvetica Neue', 'Arial', sans-serif;
+        }
+        
+        .long-heatmap-window {
+            position: absolute;
+            top: 24px;
+            display: grid;
+            grid-auto-flow: column;
+            grid-auto-columns: 12px;
+            gap: 3px;
+        }
+        
+        .long-heatmap-window div {
+            width: 12px;
+            height: 12px;
+            background: var(--bg-primary);
+            border: 1px solid var(--border-color);
+        }
+        
+        .long-heatmap-window .l1 {
+            background: var(--text-tertiary);
+            border-color: var(--text-tertiary);
+        }
+        
+        .long-heatmap-window .l2 {
+            background: var(--text-secondary);
+            border-color: var(--text-secondary);
+        }
+        
+        .long-heatmap-window .l3,
+        .long-heatmap-window .l4 {
+            background: var(--text-primary);
+            border-color: var(--text-primary);
+        }
+        
+        .long-heatmap-window .future {
+            opacity: 0.3;
+        }
+        
+"""
+
+# 长时间范围热力图只渲染可见的列，滚动时按窗口重建
+LONG_RANGE_JS = """
+        (function() {
+            var data = LONG_RANGE;
+            var COL = 15, BUFFER = 8;
+            var box = document.getElementById('longHeatmap');
+            var win = box.querySelector('.long-heatmap-window');
+            var labelBox = box.querySelector('.long-heatmap-labels');
+            var start = Date.parse(data.start + 'T00:00:00Z');
+            var startYear = +data.start.slice(0, 4);
+            var shown = '';
+            
+            function cellInfo(i) {
+                if (data.granularity === 'day') {
+                    return [new Date(start + i * 86400000).toISOString().slice(0, 10), 1];
+                }
+                if (data.granularity === 'week') {
+                    return [new Date(start + i * 7 * 86400000).toISOString().slice(0, 10) + ' ~', 7];
+                }
+                var y = startYear + Math.floor(i / 12), m = i % 12;
+                return [y + '-' + (m < 9 ? '0' : '') + (m + 1), new Date(Date.UTC(y, m + 1, 0)).getUTCDate()];
+            }
+            
+            function render() {
+                var first = Math.max(0, Math.floor(box.scrollLeft / COL) - BUFFER);
+                var last = Math.min(data.columns, Math.ceil((box.scrollLeft + box.clientWidth) / COL) + BUFFER);
+                if (shown === first + ':' + last) return;
+                shown = first + ':' + last;
+                
+                var html = '';
+                for (var i = first * data.rows; i < last * data.rows; i++) {
+                    var c = data.cells[i];
+                    if (c === '-') {
+                        html += '<div class="future"></div>';
+                        continue;
+                    }
+                    var n = parseInt(c, 36), info = cellInfo(i);
+                    var level = n ? Math.min(4, Math.ceil(n * 4 / info[1])) : 0;
+                    var note = n ? ' · ' + (data.granularity === 'day' ? READ_MARK : n + ' ' + UNIT) : '';
+                    html += '<div class="l' + level + '" title="' + info[0] + note + '"></div>';
+                }
+                win.style.left = first * COL + 'px';
+                win.innerHTML = html;
+                
+                labelBox.innerHTML = data.labels.filter(function(l) {
+                    return l[0] >= first && l[0] < last;
+                }).map(function(l) {
+                    return '<span style="left: ' + l[0] * COL + 'px;">' + l[1] + '</span>';
+                }).join('');
+            }
+            
+            box.addEventListener('scroll', function() {
+                window.requestAnimationFrame(render);
+            }, { passive: true });
+            window.addEventListener('resize', render);
+            box.scrollLeft = box.scrollWidth;
+            render();
+        })();
+"""
+
+
+def daily_calendar_urls(day, base_url=DAILY_CALENDAR_BASE_URL):
+    """Candidate image URLs for a given day (same patterns as the page script)"""
+    return [
+        f"{base_url}/{day.year}/{day.month}{day.day}.jpg",
+        f"{base_url}/{day.year}-{day.month}-{day.day}.jpg",
+    ]
+
+
+def cache_daily_calendar(day=None, base_url=DAILY_CALENDAR_BASE_URL,
+                         cache_dir=CALENDAR_CACHE_DIR, max_width=CALENDAR_IMAGE_WIDTH):
+    """
+    Fetch today's daily calendar image once at build time and store a resized copy.
+
+    The file name carries a content hash so it can be cached forever by the browser.
+    Returns the path of the cached image, or None if no source is available.
+    """
+    day = day or datetime.now()
+    content = None
+    for url in daily_calendar_urls(day, base_url):
+        try:
+            r = requests.get(url, timeout=10)
+        except requests.RequestException as e:
+            print(f"  Error fetching {url}: {e}")
+            continue
+        if r.status_code == 200 and r.content:
+            content = r.content
+            print(f"Fetched daily calendar from {url}")
+            break
+    
+    if content is None:
+        print("⚠️  Daily calendar image not available, page will load it in the browser")
+        return None
     
+    # 返回 200 但不是图片（例如 CDN 错误页）时，交给浏览器加载
+    try:
+        img = Image.open(io.BytesIO(content))
+        if img.width > max_width:
+            img.thumbnail((max_width, max_width * 4))
+        buf = io.BytesIO()
+        img.convert("RGB").save(buf, format="JPEG", quality=85, optimize=True)
+        content = buf.getvalue()
+    except (OSError, Image.DecompressionBombError) as e:
+        print(f"⚠️  Daily calendar response is not a usable image ({e}), page will load it in the browser")
+        return None
+    
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    prefix = f"calendar-{day.strftime('%Y-%m-%d')}-"
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{prefix}{digest}.jpg")
+    
+    # 只保留当天的图片
+    for name in os.listdir(cache_dir):
+        if name.startswith("calendar-") and name != os.path.basename(path):
+            os.remove(os.path.join(cache_dir, name))
+    
+    with open(path, "wb") as f:
+        f.write(content)
+    print(f"Saved daily calendar to {path} ({len(content)} bytes)")
+    return path
+
+
+def build_render_model(reading_data, calendar_image=None, years=None, long_range=False):
+    """
+    Compute everything the page shows once, independent of language and theme.
+
+    Variants rendered from the same model only pay for templating.
+    """
     reading_days = reading_data.get("reading_days", {})
     last_updated_raw = reading_data.get("last_updated", "")
     
@@ -148,9 +477,36 @@ def generate_html(reading_data, output_file="index.html"):
     else:
         last_updated = ""
     
-    stats = calculate_stats(reading_days)
     weeks = generate_heatmap_data(reading_days, months=12)
-    month_labels = generate_month_labels(weeks)
+    
+    return {
+        "stats": calculate_stats(reading_days),
+        "weeks": weeks,
+        "month_labels": generate_month_labels(weeks),
+        "last_updated": last_updated,
+        "calendar_image": calendar_image,
+        "long_range": generate_long_range_heatmap(reading_days, years) if long_range else None,
+    }
+
+
+def render_page(model, output_file="index.html", lang=DEFAULT_LANG, theme=DEFAULT_THEME):
+    """Render the page HTML for one language/theme combination"""
+    t = LABELS[lang]
+    stats = model["stats"]
+    weeks = model["weeks"]
+    month_labels = model["month_labels"]
+    last_updated = model["last_updated"]
+    calendar_image = model["calendar_image"]
+    theme_css = "\n".join(f"            {name}: {value};" for name, value in THEMES[theme].items())
+    
+    # 单向历：构建时已缓存则直接引用本地图片，否则由浏览器加载
+    if calendar_image:
+        calendar_src = os.path.relpath(
+            calendar_image, os.path.dirname(os.path.abspath(output_file))
+        ).replace(os.sep, "/")
+        calendar_html = f'<div id="dailyCalendarContent"><img class="daily-calendar-image" src="{calendar_src}" alt="{t["calendar_alt"]}" /></div>'
+    else:
+        calendar_html = f'<div id="dailyCalendarContent" class="daily-calendar-loading">\n                        {t["loading"]}\n                    </div>'
     
     # Generate heatmap HTML
     heatmap_html = '<div class="heatmap-months">\n'
@@ -169,18 +525,50 @@ def generate_html(reading_data, output_file="index.html"):
             
             title = day["date"]
             if day["has_reading"]:
-                title += " · 已阅读"
+                title += f" · {t['read_mark']}"
             
             heatmap_html += f'  <div class="{css_class}" title="{title}" data-date="{day["date"]}"></div>\n'
     heatmap_html += '</div>\n'
     
+    heatmap_title = t["heatmap_title"]
+    heatmap_subtitle = t["heatmap_subtitle"].format(days=stats["this_year_days"])
+    heatmap_body = (
+        '            <div class="heatmap-wrapper">\n'
+        '                <div class="heatmap-container">\n'
+        f'{heatmap_html}\n'
+        '                </div>\n'
+        '            </div>'
+    )
+    long_range_css = ""
+    long_range_js = ""
+    
+    long_range = model.get("long_range")
+    if long_range:
+        heatmap_title = t["long_heatmap_title"]
+        heatmap_subtitle = t["long_heatmap_subtitle"].format(days=long_range["total_days"], start=long_range["since"])
+        heatmap_body = (
+            '            <div class="long-heatmap" id="longHeatmap">\n'
+            f'                <div class="long-heatmap-track" style="width: {long_range["columns"] * 15}px; height: {24 + long_range["rows"] * 15}px;">\n'
+            '                    <div class="long-heatmap-labels"></div>\n'
+            f'                    <div class="long-heatmap-window" style="grid-template-rows: repeat({long_range["rows"]}, 12px);"></div>\n'
+            '                </div>\n'
+            '            </div>'
+        )
+        long_range_css = LONG_RANGE_CSS
+        long_range_js = (
+            f"        var LONG_RANGE = {json.dumps(long_range)};\n"
+            f"        var READ_MARK = {json.dumps(t['read_mark'], ensure_ascii=False)};\n"
+            f"        var UNIT = {json.dumps(t['unit'], ensure_ascii=False)};\n"
+            + LONG_RANGE_JS
+        )
+    
     html = f"""<!DOCTYPE html>
-<html lang="zh-CN">
+<html lang="{t['html_lang']}">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="description" content="我的阅读记录 - Kindle 风格">
-    <title>阅读记录</title>
+    <meta name="description" content="{t['description']}">
+    <title>{t['title']}</title>
     <style>
         * {{
             margin: 0;
@@ -189,15 +577,8 @@ def generate_html(reading_data, output_file="index.html"):
         }}
         
         :root {{
-            /* Kindle 经典配色 */
-            --bg-primary: #f4f1ea;
-            --bg-secondary: #ffffff;
-            --text-primary: #1a1a1a;
-            --text-secondary: #666666;
-            --text-tertiary: #999999;
-            --border-color: #d4d4d4;
-            --accent: #1a1a1a;
-            --shadow: 0 1px 3px rgba(0, 0, 0, 0.08);
+            /* {theme} 配色 */
+{theme_css}
         }}
         
         body {{
@@ -468,7 +849,7 @@ def generate_html(reading_data, output_file="index.html"):
             box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
         }}
         
-        @media (max-width: 1024px) {{
+{long_range_css}        @media (max-width: 1024px) {{
             .main-layout {{
                 grid-template-columns: 1fr;
             }}
@@ -513,7 +894,7 @@ def generate_html(reading_data, output_file="index.html"):
 <body>
     <div class="container">
         <header>
-            <h1>阅读记录</h1>
+            <h1>{t['title']}</h1>
             <p class="subtitle">Reading Journal</p>
         </header>
         
@@ -521,40 +902,34 @@ def generate_html(reading_data, output_file="index.html"):
             <div class="stats">
                 <div class="stat-item">
                     <div class="stat-label">Total Days</div>
-                    <div class="stat-value">{stats['total_days']}<span class="stat-unit">天</span></div>
+                    <div class="stat-value">{stats['total_days']}<span class="stat-unit">{t['unit']}</span></div>
                 </div>
                 <div class="stat-item">
                     <div class="stat-label">This Month</div>
-                    <div class="stat-value">{stats['this_month_days']}<span class="stat-unit">天</span></div>
+                    <div class="stat-value">{stats['this_month_days']}<span class="stat-unit">{t['unit']}</span></div>
                 </div>
                 <div class="stat-item">
                     <div class="stat-label">Current Streak</div>
-                    <div class="stat-value">{stats['current_streak']}<span class="stat-unit">天</span></div>
+                    <div class="stat-value">{stats['current_streak']}<span class="stat-unit">{t['unit']}</span></div>
                 </div>
                 <div class="stat-item">
                     <div class="stat-label">Longest Streak</div>
-                    <div class="stat-value">{stats['longest_streak']}<span class="stat-unit">天</span></div>
+                    <div class="stat-value">{stats['longest_streak']}<span class="stat-unit">{t['unit']}</span></div>
                 </div>
             </div>
             
             <div class="daily-calendar">
                 <div class="daily-calendar-wrapper" id="dailyCalendarWrapper">
-                    <div id="dailyCalendarContent" class="daily-calendar-loading">
-                        加载中...
-                    </div>
+                    {calendar_html}
                 </div>
             </div>
         </div>
         
         <section class="heatmap-section">
-            <h2 class="section-title">全年阅读活动</h2>
-            <p class="section-subtitle">过去一年共阅读 {stats['this_year_days']} 天</p>
+            <h2 class="section-title">{heatmap_title}</h2>
+            <p class="section-subtitle">{heatmap_subtitle}</p>
             
-            <div class="heatmap-wrapper">
-                <div class="heatmap-container">
-{heatmap_html}
-                </div>
-            </div>
+{heatmap_body}
         </section>
         
         <footer>
@@ -570,50 +945,55 @@ def generate_html(reading_data, output_file="index.html"):
     
     <script>
         // 加载单向历
+        var CALENDAR_BASE_URL = {json.dumps(DAILY_CALENDAR_BASE_URL)};
+        var CALENDAR_CACHED = {'true' if calendar_image else 'false'};
+        var CALENDAR_ALT = {json.dumps(t['calendar_alt'], ensure_ascii=False)};
+        var CALENDAR_DATE = {json.dumps(t['calendar_date'], ensure_ascii=False)};
+        
         function loadDailyCalendar() {{
             var d = new Date();
             var y = d.getFullYear();
             var m = d.getMonth() + 1;
             var n = d.getDate();
-            var mm = m > 9 ? m : "0" + m;
-            var dd = n > 9 ? n : "0" + n;
             
-            // 备用图片源 - 尝试多种可能的 URL 格式
+            // 备用图片源 - 同时请求，最先加载成功的胜出
             var imgSources = [
-                "https://img.owspace.com/Public/uploads/Download/" + y + "/" + m + n + ".jpg",
-                "https://img.owspace.com/Public/uploads/Download/" + y + "-" + m + "-" + n + ".jpg"
+                CALENDAR_BASE_URL + "/" + y + "/" + m + n + ".jpg",
+                CALENDAR_BASE_URL + "/" + y + "-" + m + "-" + n + ".jpg"
             ];
+            var settled = false;
+            var failed = 0;
             
-            tryLoadImage(0);
-            
-            function tryLoadImage(index) {{
-                if (index >= imgSources.length) {{
+            imgSources.forEach(function(src) {{
+                var img = new Image();
+                img.onload = function() {{
+                    if (settled) return;
+                    settled = true;
+                    document.getElementById("dailyCalendarContent").innerHTML = 
+                        '<img class="daily-calendar-image" src="' + src + '" alt="' + CALENDAR_ALT + '" referrerpolicy="no-referrer" />';
+                }};
+                img.onerror = function() {{
+                    failed += 1;
+                    if (settled || failed < imgSources.length) return;
                     // 所有源都失败，显示默认内容
+                    var dateText = CALENDAR_DATE.replace("{{y}}", y).replace("{{m}}", m).replace("{{n}}", n);
                     document.getElementById("dailyCalendarContent").innerHTML = 
                         '<div class="daily-calendar-loading" style="padding: 3rem 1rem; text-align: center;">' +
                         '<p style="font-size: 3rem; margin-bottom: 1rem;">📚</p>' +
-                        '<p style="font-size: 1.2rem; margin-bottom: 0.5rem;">' + y + ' 年 ' + parseInt(m) + ' 月 ' + parseInt(n) + ' 日</p>' +
+                        '<p style="font-size: 1.2rem; margin-bottom: 0.5rem;">' + dateText + '</p>' +
                         '<p style="font-size: 0.85rem; color: var(--text-tertiary); margin-top: 1rem;">Keep Reading · Keep Growing</p>' +
                         '</div>';
-                    return;
-                }}
-                
-                var img = new Image();
-                img.onload = function() {{
-                    document.getElementById("dailyCalendarContent").innerHTML = 
-                        '<img class="daily-calendar-image" src="' + imgSources[index] + '" alt="单向历" referrerpolicy="no-referrer" />';
-                }};
-                img.onerror = function() {{
-                    tryLoadImage(index + 1);
                 }};
                 img.referrerPolicy = 'no-referrer';
-                img.src = imgSources[index];
-            }}
+                img.src = src;
+            }});
         }}
         
         // 页面加载时执行
         window.onload = function() {{
-            loadDailyCalendar();
+            if (!CALENDAR_CACHED) {{
+                loadDailyCalendar();
+            }}
         }};
         
         // Tooltip for heatmap
@@ -639,26 +1019,149 @@ def generate_html(reading_data, output_file="index.html"):
                 }}
             }});
         }});
-    </script>
+{long_range_js}    </script>
 </body>
 </html>"""
     
+    return html
+
+
+def write_page(model, output_file="index.html", lang=DEFAULT_LANG, theme=DEFAULT_THEME):
+    """Render one variant and write it to output_file"""
+    html = render_page(model, output_file, lang, theme)
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(html)
+    print(f"✅ Page ({lang}/{theme}) generated: {output_file}")
+    return output_file
+
+
+def variant_output_file(lang, theme, output_file="index.html"):
+    """index.html for the default variant, index.en.dark.html etc. for the others"""
+    stem, ext = os.path.splitext(output_file)
+    parts = [stem]
+    if lang != DEFAULT_LANG:
+        parts.append(lang)
+    if theme != DEFAULT_THEME:
+        parts.append(theme)
+    return ".".join(parts) + ext
+
+
+def parse_variants(value):
+    """Parse "zh:kindle,en:dark" into [(lang, theme), ...], raising ValueError on bad entries"""
+    variants = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        lang, sep, theme = item.partition(":")
+        if not sep or lang not in LABELS or theme not in THEMES:
+            raise ValueError(
+                f"invalid variant {item!r}: expected lang:theme with lang in "
+                f"{', '.join(sorted(LABELS))} and theme in {', '.join(sorted(THEMES))}"
+            )
+        variants.append((lang, theme))
+    if not variants:
+        raise ValueError("no variants given")
+    return variants
+
+
+def generate_variants(model, variants=PAGE_VARIANTS, output_file="index.html"):
+    """Render all (lang, theme) variants of one model, sharing the computed model"""
+    for lang, theme in variants:
+        if lang not in LABELS or theme not in THEMES:
+            raise Exception(f"Unknown page variant: {lang}:{theme}")
     
-    print(f"✅ Page with daily calendar generated: {output_file}")
-    print(f"📊 Stats: {stats}")
+    # 渲染是纯 CPU 的字符串拼接，线程池受 GIL 限制并无收益，按顺序生成
+    return [
+        write_page(model, variant_output_file(lang, theme, output_file), lang, theme)
+        for lang, theme in variants
+    ]
+
+
+def generate_html(reading_data, output_file="index.html", calendar_image=None):
+    """Generate HTML page with stats, daily calendar, and heatmap"""
+    model = build_render_model(reading_data, calendar_image)
+    write_page(model, output_file)
+    print(f"📊 Stats: {model['stats']}")
+
+
+def years_arg(value):
+    """argparse type for --years: a positive number of years, or "all" (returned as None)"""
+    if value == "all":
+        return None
+    try:
+        years = int(value)
+    except ValueError:
+        years = 0
+    if years < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number of years or 'all', got {value!r}")
+    return years
 
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Generate Kindle reading page")
+    parser.add_argument(
+        "--cache-calendar",
+        action="store_true",
+        help="Fetch today's daily calendar image at build time and reference the local copy",
+    )
+    parser.add_argument(
+        "--years",
+        type=years_arg,
+        default=False,
+        help="Show a long-range heatmap over the last N years, or 'all' for the whole history",
+    )
+    parser.add_argument(
+        "--variants",
+        help="Comma-separated lang:theme variants to render, e.g. zh:kindle,en:kindle,en:dark",
+    )
+    parser.add_argument(
+        "--no-api",
+        action="store_true",
+        help=f"Skip writing the static JSON API to {API_DIR.name}/",
+    )
+    parser.add_argument(
+        "--budget",
+        default=PAGE_BUDGET_FILE,
+        help="Page budget JSON checked after generation (skipped if the file does not exist)",
+    )
+    args = parser.parse_args()
+    
     print("📖 Generating reading page with daily calendar...")
     
+    variants = PAGE_VARIANTS
+    if args.variants:
+        try:
+            variants = parse_variants(args.variants)
+        except ValueError as e:
+            parser.error(f"--variants: {e}")
+    
     reading_data = load_reading_data()
-    generate_html(reading_data)
+    calendar_image = cache_daily_calendar() if args.cache_calendar else None
+    
+    if args.years is not False:
+        model = build_render_model(reading_data, calendar_image, years=args.years, long_range=True)
+    else:
+        model = build_render_model(reading_data, calendar_image)
+    pages = generate_variants(model, variants)
+    print(f"📊 Stats: {model['stats']}")
+    
+    if not args.no_api:
+        build_static_api(reading_data, model["stats"])
+    
+    # 页面体积预算检查，超出时构建失败
+    if args.budget and os.path.exists(args.budget):
+        try:
+            check_page_budget(pages, args.budget)
+        except (BudgetExceededError, BudgetConfigError) as e:
+            print(f"❌ {e}")
+            return False
     
     print("✅ Done!")
+    return True
 
 
 if __name__ == "__main__":
-    main()
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,157 @@
+"""Import reading days from local reading statistics databases"""
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from config import KOREADER_MIN_SECONDS, READING_DATA_FILE
+
+
+class ReadingImporter:
+    """
+    Base class for SQLite-backed importers.
+
+    Subclasses provide a single aggregate query returning (day, total) rows;
+    the database does the grouping so years of records never reach Python.
+    """
+
+    name = "base"
+    source = "base"  # 写入 reading_data.json 的 sources
+    query = ""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+
+    def query_params(self):
+        return ()
+
+    def check(self):
+        """Fail early if the database is missing"""
+        if not os.path.exists(self.db_path):
+            raise Exception(f"{self.name} database not found: {self.db_path}")
+
+    def load(self):
+        """Return {date_str: total} for every day with reading activity"""
+        self.check()
+
+        # 只读打开，避免和阅读器本身争用写锁
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(self.query, self.query_params()).fetchall()
+        finally:
+            conn.close()
+
+        reading_dict = {day: total for day, total in rows if day}
+        print(f"📚 Imported {len(reading_dict)} reading days from {self.name}")
+        return reading_dict
+
+
+class KOReaderImporter(ReadingImporter):
+    """KOReader statistics plugin (statistics.sqlite3), total seconds per day"""
+
+    name = "KOReader"
+    source = "koreader"
+    query = """
+        SELECT date(start_time, 'unixepoch', 'localtime') AS day, SUM(duration) AS seconds
+        FROM page_stat_data
+        GROUP BY day
+        HAVING seconds >= ?
+        ORDER BY day
+    """
+
+    def __init__(self, db_path, min_seconds=KOREADER_MIN_SECONDS):
+        super().__init__(db_path)
+        self.min_seconds = min_seconds
+
+    def query_params(self):
+        return (self.min_seconds,)
+
+
+class CalibreImporter(ReadingImporter):
+    """Calibre library (metadata.db), viewer annotations and reading positions per day"""
+
+    name = "Calibre"
+    source = "calibre"
+    query = """
+        SELECT day, COUNT(*) AS records FROM (
+            SELECT date(timestamp, 'unixepoch', 'localtime') AS day FROM annotations
+            UNION ALL
+            SELECT date(epoch, 'unixepoch', 'localtime') AS day FROM last_read_positions
+        )
+        GROUP BY day
+        ORDER BY day
+    """
+
+
+IMPORT_SOURCES = (KOReaderImporter.source, CalibreImporter.source)
+
+
+def merge_reading_days(reading_dict, *sources):
+    """Merge imported per-day totals into the reading-days model (date -> 1)"""
+    merged = dict(reading_dict)
+    for source in sources:
+        for day in source:
+            merged[day] = 1
+    return dict(sorted(merged.items()))
+
+
+def import_reading_days(importers, reading_data_file=READING_DATA_FILE):
+    """Merge imported days into an existing reading data file, without a Kindle sync"""
+    reading_data = {}
+    if os.path.exists(reading_data_file):
+        with open(reading_data_file, "r", encoding="utf-8") as f:
+            reading_data = json.load(f)
+
+    imported = {importer.source: importer.load() for importer in importers}
+    reading_dict = merge_reading_days(reading_data.get("reading_days", {}), *imported.values())
+
+    # 导入的日期总是记录来源，下次 Kindle 同步据此保留它们
+    sources = reading_data.get("sources", {})
+    for name, days in imported.items():
+        for day in days:
+            if name not in sources.setdefault(day, []):
+                sources[day].append(name)
+    reading_data["sources"] = {day: sources[day] for day in reading_dict if day in sources}
+
+    reading_data.update({
+        "reading_days": reading_dict,
+        "total_days": len(reading_dict),
+        "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    })
+
+    os.makedirs(os.path.dirname(reading_data_file) or ".", exist_ok=True)
+    with open(reading_data_file, "w", encoding="utf-8") as f:
+        json.dump(reading_data, f, ensure_ascii=False, indent=2)
+    print(f"Saved reading data to {reading_data_file}")
+    print(f"Total reading days: {len(reading_dict)}")
+    return reading_dict
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge local reader statistics into the reading data")
+    parser.add_argument("--koreader", help="Path to KOReader statistics.sqlite3")
+    parser.add_argument("--calibre", help="Path to Calibre metadata.db")
+    parser.add_argument("--output", default=READING_DATA_FILE, help="Reading data file to merge into")
+    args = parser.parse_args()
+
+    importers = []
+    if args.koreader:
+        importers.append(KOReaderImporter(args.koreader))
+    if args.calibre:
+        importers.append(CalibreImporter(args.calibre))
+    if not importers:
+        parser.error("give at least one of --koreader or --calibre")
+
+    try:
+        import_reading_days(importers, args.output)
+    except Exception as e:
+        print(f"❌ {e}")
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -1,76 +1,285 @@
 """Sync Kindle reading data from Amazon"""
 
 import argparse
+import hashlib
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from http.cookies import SimpleCookie
 from datetime import datetime
+from urllib.parse import urlparse
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from config import (
     KINDLE_HISTORY_URL,
+    KINDLE_INSIGHTS_PATH,
+    KINDLE_MARKETPLACES,
     KINDLE_HEADER,
     DATA_DIR,
     KINDLE_DATA_FILE,
+    KINDLE_RAW_ARCHIVE,
     READING_DATA_FILE,
+    KINDLE_SESSION_FILE,
+    KINDLE_PROBE_TIMEOUT,
 )
+from importers import IMPORT_SOURCES, KOReaderImporter, CalibreImporter, merge_reading_days
+from storage import project_payload, save_compact_json, archive_raw_payload
+
+
+class SessionExpiredError(Exception):
+    """Raised when Amazon no longer accepts the stored login"""
+
+
+def marketplace_cookie_env(host):
+    """Environment variable holding the cookie of one marketplace, e.g. KINDLE_COOKIE_WWW_AMAZON_CO_JP"""
+    return "KINDLE_COOKIE_" + re.sub(r"[^0-9A-Za-z]", "_", host).upper()
+
+
+def _domain_match(host, domain):
+    domain = domain.lstrip(".")
+    return host == domain or host.endswith("." + domain)
 
 
 class KindleSync:
-    def __init__(self, cookie):
+    def __init__(self, cookie, importers=None, session_file=KINDLE_SESSION_FILE, marketplaces=None,
+                 kindle_data_file=KINDLE_DATA_FILE, reading_data_file=READING_DATA_FILE,
+                 rate_limiter=None, raw_archive=None):
         self.kindle_cookie = cookie
-        self.session = requests.Session()
+        self.importers = importers or []
+        self.session_file = session_file
+        self.kindle_data_file = kindle_data_file
+        self.reading_data_file = reading_data_file
+        self.rate_limiter = rate_limiter
+        self.raw_archive = raw_archive
+        self.reading_dict = {}
         self.header = KINDLE_HEADER
-        self.kindle_url = KINDLE_HISTORY_URL
+        if marketplaces:
+            self.kindle_urls = [m.rstrip("/") + KINDLE_INSIGHTS_PATH for m in marketplaces]
+        else:
+            self.kindle_urls = [m + KINDLE_INSIGHTS_PATH for m in KINDLE_MARKETPLACES] or [KINDLE_HISTORY_URL]
+        self.kindle_url = self.kindle_urls[0]
+        self.cookies = self._resolve_cookies()
+        # 所有商城共用一个会话，连接池按商城数量放大，以便并发请求
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(self.kindle_urls), pool_maxsize=2 * len(self.kindle_urls))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.has_session = False
+        self.from_store = False
+        self.login_expired = False
 
-    def _parse_kindle_cookie(self):
-        """Parse cookie string to cookie jar"""
+    def _resolve_cookies(self):
+        """
+        Cookie string per marketplace host.
+
+        The cookie may be one string shared by every marketplace or a
+        {base_url: cookie} mapping; KINDLE_COOKIE_<HOST> overrides the shared string.
+        """
+        mapping = {}
+        default = self.kindle_cookie
+        if isinstance(self.kindle_cookie, dict):
+            mapping = {urlparse(key).netloc or key: value for key, value in self.kindle_cookie.items()}
+            default = None
+        cookies = {}
+        for url in self.kindle_urls:
+            host = urlparse(url).netloc
+            cookies[host] = mapping.get(host) or os.environ.get(marketplace_cookie_env(host)) or default or ""
+        return cookies
+
+    def _set_raw_cookies(self, cookiejar, host):
+        """Add the configured cookie of one marketplace, scoped to its domain"""
         cookie = SimpleCookie()
-        cookie.load(self.kindle_cookie)
-        cookies_dict = {}
-        cookiejar = None
+        cookie.load(self.cookies[host])
         for key, morsel in cookie.items():
-            cookies_dict[key] = morsel.value
-            cookiejar = requests.utils.cookiejar_from_dict(
-                cookies_dict, cookiejar=None, overwrite=True
+            cookiejar.set(key, morsel.value, domain=urlparse(f"//{host}").hostname, path="/")
+
+    def _parse_kindle_cookie(self):
+        """Parse the cookie strings to one cookie jar, each entry scoped to its marketplace"""
+        cookiejar = requests.cookies.RequestsCookieJar()
+        for host in self.cookies:
+            self._set_raw_cookies(cookiejar, host)
+        return cookiejar or None
+
+    def _cookie_hash(self):
+        return hashlib.sha256(json.dumps(sorted(self.cookies.items())).encode("utf-8")).hexdigest()
+
+    def _load_session(self):
+        """
+        Load the cookie jar saved by a previous run.
+
+        The store is only used while it was created from the same cookie string,
+        so updating the KINDLE_COOKIE secret always takes effect.
+        """
+        if not self.session_file or not os.path.exists(self.session_file):
+            return None
+        try:
+            with open(self.session_file, "r", encoding="utf-8") as f:
+                store = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️  Ignoring unreadable session store: {e}")
+            return None
+        if store.get("cookie_hash") != self._cookie_hash():
+            return None
+
+        cookiejar = requests.cookies.RequestsCookieJar()
+        for c in store.get("cookies", []):
+            cookiejar.set(
+                c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"),
+                expires=c.get("expires"), secure=c.get("secure", False),
             )
-        return cookiejar
+        return cookiejar or None
 
-    def make_session(self):
-        """Create session with cookies"""
-        cookies = self._parse_kindle_cookie()
+    def _get(self, url, **kwargs):
+        """GET through the shared session, waiting for the rate limiter if any"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return self.session.get(url, **kwargs)
+
+    def save_session(self):
+        """Persist the current cookie jar, including cookies refreshed by Amazon"""
+        if not self.session_file:
+            return
+        # Amazon 刷新的 cookie 是父域名（.amazon.com），替换掉同名的原始 cookie
+        refreshed = [(c.name, c.domain) for c in self.session.cookies if c.domain.startswith(".")]
+        store = {
+            "cookie_hash": self._cookie_hash(),
+            "saved_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "cookies": [
+                {
+                    "name": c.name,
+                    "value": c.value,
+                    "domain": c.domain,
+                    "path": c.path,
+                    "expires": c.expires,
+                    "secure": c.secure,
+                }
+                for c in self.session.cookies
+                if c.domain.startswith(".")
+                or not any(name == c.name and _domain_match(c.domain, domain) for name, domain in refreshed)
+            ],
+        }
+        # 会话里是登录凭据，只允许当前用户读写
+        os.makedirs(os.path.dirname(self.session_file) or ".", exist_ok=True)
+        fd = os.open(self.session_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(store, f)
+        print(f"Saved session to {self.session_file}")
+
+    def make_session(self, use_store=True):
+        """Create session with cookies, reusing the stored session when possible"""
+        cookies = self._load_session() if use_store else None
+        self.from_store = cookies is not None
+        if cookies is None:
+            cookies = self._parse_kindle_cookie()
         if not cookies:
             raise Exception("Please make sure your amazon cookie is correct")
         self.session.cookies = cookies
         self.has_session = True
 
-    def get_kindle_read_data(self):
+    def probe_session(self, kindle_url=None):
+        """
+        Cheap login check before the heavy fetches.
+
+        Requests the insights page without following redirects and without reading
+        the body; an expired login is redirected to the sign-in page.
+        """
+        html_url = (kindle_url or self.kindle_url).replace('/data', '')
+        r = self._get(
+            html_url, headers=self.header, allow_redirects=False,
+            stream=True, timeout=KINDLE_PROBE_TIMEOUT,
+        )
+        r.close()
+        location = r.headers.get("Location", "")
+        if r.status_code in (401, 403) or (r.is_redirect and "signin" in location):
+            raise SessionExpiredError(
+                f"Amazon login expired for {urlparse(html_url).netloc} (HTTP {r.status_code}), "
+                "please update KINDLE_COOKIE"
+            )
+
+    def probe_all(self, kindle_urls=None):
+        """
+        Probe marketplaces concurrently.
+
+        Returns (valid, expired): the URLs that accepted the login, and a
+        {url: SessionExpiredError} mapping. Unreachable marketplaces are skipped.
+        """
+        kindle_urls = kindle_urls or self.kindle_urls
+        with ThreadPoolExecutor(max_workers=len(kindle_urls)) as executor:
+            futures = {url: executor.submit(self.probe_session, url) for url in kindle_urls}
+        valid = []
+        expired = {}
+        for url, future in futures.items():
+            try:
+                future.result()
+                valid.append(url)
+            except SessionExpiredError as e:
+                expired[url] = e
+            except requests.RequestException as e:
+                print(f"⚠️  Failed to reach {urlparse(url).netloc}: {e}, skipping")
+        return valid, expired
+
+    def reset_cookies(self, kindle_urls):
+        """Replace the stored cookies of these marketplaces with the configured raw cookies"""
+        for url in kindle_urls:
+            host = urlparse(url).netloc
+            hostname = urlparse(url).hostname
+            for c in [c for c in self.session.cookies if _domain_match(hostname, c.domain)]:
+                self.session.cookies.clear(c.domain, c.path, c.name)
+            self._set_raw_cookies(self.session.cookies, host)
+
+    def check_login(self):
+        """
+        Make the session and probe every marketplace.
+
+        Marketplaces whose stored session expired are retried with their raw
+        cookie; the ones that still fail are skipped. Returns the valid URLs.
+        """
+        self.make_session()
+        valid, expired = self.probe_all()
+        if expired and self.from_store:
+            hosts = ", ".join(urlparse(url).netloc for url in expired)
+            print(f"⚠️  Stored session expired for {hosts}, retrying with the configured cookie...")
+            self.reset_cookies(expired)
+            retried, expired = self.probe_all(list(expired))
+            valid += retried
+        if not valid:
+            if expired:
+                raise next(iter(expired.values()))
+            raise Exception("Could not reach any Amazon marketplace")
+        for e in expired.values():
+            print(f"⚠️  {e}, skipping")
+        print("✅ Amazon login is valid")
+        return valid
+
+    def get_kindle_read_data(self, kindle_url=None):
         """Get Kindle reading data from Amazon - 参考 GitHubPoster 的方法"""
         if not self.has_session:
             self.make_session()
+        kindle_url = kindle_url or self.kindle_url
         
         # 方法 1: 先从 HTML 页面获取完整的 days_read（最可靠的方法）
         # 参考 GitHubPoster-main/github_poster/loader/kindle_loader.py
-        html_url = self.kindle_url.replace('/data', '')
+        html_url = kindle_url.replace('/data', '')
         print(f"Fetching Kindle HTML from {html_url}...")
-        r_html = self.session.get(html_url, headers=self.header)
+        r_html = self._get(html_url, headers=self.header)
         
         data = {}
+        days_read_data = {}
         
         if r_html.status_code == 200:
             print("Successfully fetched HTML page")
             # 使用 GitHubPoster 的正则表达式提取 days_read
             days_read_data = self._parse_html_data(r_html.text)
             if days_read_data.get("days_read"):
-                data = days_read_data
+                data = dict(days_read_data)
                 print(f"✅ Extracted {len(data['days_read'])} reading days from HTML")
         
         # 方法 2: 同时获取 API 数据以获取统计信息（streaks, goals 等）
-        print(f"\nFetching additional stats from {self.kindle_url}...")
-        r_api = self.session.get(self.kindle_url, headers=self.header)
+        print(f"\nFetching additional stats from {kindle_url}...")
+        r_api = self._get(kindle_url, headers=self.header)
         
         if r_api.status_code == 200:
             try:
@@ -88,6 +297,47 @@ class KindleSync:
         
         return data
 
+    def fetch_marketplaces(self, kindle_urls=None):
+        """Fetch all marketplaces concurrently over the shared session, keyed by host"""
+        kindle_urls = kindle_urls or self.kindle_urls
+        with ThreadPoolExecutor(max_workers=len(kindle_urls)) as executor:
+            futures = {
+                urlparse(url).netloc: executor.submit(self.get_kindle_read_data, url)
+                for url in kindle_urls
+            }
+        results = {}
+        for host, future in futures.items():
+            try:
+                results[host] = future.result()
+            except Exception as e:
+                print(f"⚠️  Failed to fetch {host}: {e}")
+        if not results:
+            raise Exception("Failed to fetch any Kindle data")
+        return results
+
+    def merge_marketplaces(self, results):
+        """
+        Merge per-marketplace payloads into one reading-days dict.
+
+        Returns (data, reading_dict, sources): the raw payload of the first
+        marketplace with the merged days_read, and the hosts each day came from.
+        """
+        reading_dict = {}
+        sources = {}
+        for host, data in results.items():
+            for day in self.parse_reading_days(data):
+                reading_dict[day] = 1
+                sources.setdefault(day, []).append(host)
+        reading_dict = dict(sorted(reading_dict.items()))
+        
+        hosts = list(results)
+        data = dict(results[hosts[0]])
+        if len(hosts) > 1:
+            data["days_read"] = list(reading_dict)
+            data["marketplace_data"] = results
+            print(f"🌐 Merged {len(reading_dict)} reading days from {', '.join(hosts)}")
+        return data, reading_dict, {day: sources[day] for day in reading_dict}
+
     def _parse_html_data(self, html_text):
         """
         Parse reading data from HTML
@@ -211,15 +461,51 @@ class KindleSync:
         
         return reading_dict
 
-    def save_data(self, data, reading_dict):
+    def carry_forward(self, reading_dict, sources, refreshed, carried=IMPORT_SOURCES):
+        """
+        Keep days from the previous reading data whose source was not refreshed this run.
+
+        The file is rebuilt on every sync, so days imported by importers.py (or
+        by an earlier run with --koreader/--calibre), and days of a marketplace
+        that failed this run, would otherwise be dropped. Only sources named in
+        `carried` are kept; returns (reading_dict, sources).
+        """
+        try:
+            with open(self.reading_data_file, "r", encoding="utf-8") as f:
+                previous = json.load(f).get("sources", {})
+        except (OSError, json.JSONDecodeError):
+            return reading_dict, sources
+
+        reading_dict = dict(reading_dict)
+        sources = {day: list(names) for day, names in sources.items()}
+        kept = {}
+        for day, names in previous.items():
+            for name in names:
+                if name in carried and name not in refreshed:
+                    reading_dict[day] = 1
+                    if name not in sources.setdefault(day, []):
+                        sources[day].append(name)
+                    kept[name] = kept.get(name, 0) + 1
+        for name, count in kept.items():
+            print(f"📎 Kept {count} reading days from {name} (not refreshed this run)")
+
+        reading_dict = dict(sorted(reading_dict.items()))
+        return reading_dict, {day: sources[day] for day in reading_dict if day in sources}
+
+    def save_data(self, data, reading_dict, sources=None):
         """Save data to files"""
         # Create data directory if not exists
-        os.makedirs(DATA_DIR, exist_ok=True)
+        for path in (self.kindle_data_file, self.reading_data_file):
+            os.makedirs(os.path.dirname(path) or DATA_DIR, exist_ok=True)
         
-        # Save raw Kindle data
-        with open(KINDLE_DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        print(f"Saved raw Kindle data to {KINDLE_DATA_FILE}")
+        # Save the Kindle fields the pipeline reads, compactly
+        save_compact_json(self.kindle_data_file, project_payload(data))
+        print(f"Saved Kindle data to {self.kindle_data_file}")
+        
+        # 完整原始数据只在需要时压缩存档
+        if self.raw_archive:
+            archive_raw_payload(data, self.raw_archive)
+            print(f"Archived raw Kindle payload to {self.raw_archive}")
         
         # Save processed reading data
         reading_data = {
@@ -227,20 +513,44 @@ class KindleSync:
             "total_days": len(reading_dict),
             "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         }
+        # 多商城同步或合并了本地数据时记录每一天的来源
+        single = [urlparse(self.kindle_url).netloc]
+        if sources and (len(self.kindle_urls) > 1 or any(names != single for names in sources.values())):
+            reading_data["sources"] = sources
         
-        with open(READING_DATA_FILE, "w", encoding="utf-8") as f:
+        with open(self.reading_data_file, "w", encoding="utf-8") as f:
             json.dump(reading_data, f, ensure_ascii=False, indent=2)
-        print(f"Saved reading data to {READING_DATA_FILE}")
+        print(f"Saved reading data to {self.reading_data_file}")
         print(f"Total reading days: {len(reading_dict)}")
 
     def sync(self):
         """Main sync method"""
         try:
-            # Fetch data
-            data = self.get_kindle_read_data()
+            # 本地数据库缺失时在访问 Amazon 之前就失败
+            for importer in self.importers:
+                importer.check()
+            
+            # 先用轻量请求确认登录有效，过期时立即退出
+            kindle_urls = self.check_login()
             
-            # Parse reading days
-            reading_dict = self.parse_reading_days(data)
+            # Fetch data and parse reading days, all marketplaces at once
+            results = self.fetch_marketplaces(kindle_urls)
+            data, reading_dict, sources = self.merge_marketplaces(results)
+            
+            # 合并本地阅读器的统计数据，并记录来源
+            imported = {importer.source: importer.load() for importer in self.importers}
+            if imported:
+                reading_dict = merge_reading_days(reading_dict, *imported.values())
+                for name, days in imported.items():
+                    for day in days:
+                        sources.setdefault(day, []).append(name)
+                sources = {day: sources[day] for day in reading_dict}
+            
+            # 本次未刷新的来源（未重新导入的本地数据、失败的商城）保留上次的日期
+            reading_dict, sources = self.carry_forward(
+                reading_dict, sources, set(results) | set(imported),
+                carried=IMPORT_SOURCES + tuple(urlparse(url).netloc for url in self.kindle_urls),
+            )
             
             if not reading_dict:
                 print("⚠️  Warning: No reading days found in the data")
@@ -251,9 +561,15 @@ class KindleSync:
                 print("   Tip: Check your reading history at Amazon Kindle Reading Insights")
             
             # Save data
-            self.save_data(data, reading_dict)
+            self.save_data(data, reading_dict, sources)
+            self.save_session()
+            self.reading_dict = reading_dict
             
             return True
+        except SessionExpiredError as e:
+            print(f"❌ {e}")
+            self.login_expired = True
+            return False
         except Exception as e:
             print(f"Error during sync: {str(e)}")
             import traceback
@@ -264,18 +580,46 @@ class KindleSync:
 def main():
     parser = argparse.ArgumentParser(description="Sync Kindle reading data from Amazon")
     parser.add_argument("cookie", nargs="?", help="Amazon Kindle cookie")
+    parser.add_argument("--koreader", help="Path to KOReader statistics.sqlite3 to merge")
+    parser.add_argument("--calibre", help="Path to Calibre metadata.db to merge")
+    parser.add_argument(
+        "--archive-raw",
+        action="store_true",
+        help=f"Also keep the full Kindle payload gzip-compressed in {KINDLE_RAW_ARCHIVE.name}",
+    )
+    parser.add_argument(
+        "--marketplace",
+        action="append",
+        help="Marketplace base URL to sync, e.g. https://www.amazon.cn (repeatable, default: KINDLE_MARKETPLACES); "
+        "set KINDLE_COOKIE_<HOST> (e.g. KINDLE_COOKIE_WWW_AMAZON_CN) to give it its own cookie",
+    )
     
     args = parser.parse_args()
     
-    # Get cookie from argument or environment variable
+    # Get cookie from argument or environment variable; KINDLE_COOKIE_<HOST> sets one marketplace
     cookie = args.cookie or os.environ.get("KINDLE_COOKIE")
+    marketplaces = args.marketplace or KINDLE_MARKETPLACES
     
-    if not cookie:
+    per_marketplace = marketplaces and all(
+        os.environ.get(marketplace_cookie_env(urlparse(m).netloc)) for m in marketplaces
+    )
+    if not cookie and not per_marketplace:
         print("Error: Please provide Kindle cookie as argument or set KINDLE_COOKIE environment variable")
         return False
     
+    importers = []
+    if args.koreader:
+        importers.append(KOReaderImporter(args.koreader))
+    if args.calibre:
+        importers.append(CalibreImporter(args.calibre))
+    
     # Create syncer and sync
-    syncer = KindleSync(cookie)
+    syncer = KindleSync(
+        cookie,
+        importers=importers,
+        marketplaces=args.marketplace,
+        raw_archive=KINDLE_RAW_ARCHIVE if args.archive_raw else None,
+    )
     success = syncer.sync()
     
     if success:
@@ -0,0 +1,164 @@
+"""Check generated pages against a page-weight budget"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+from config import PAGE_BUDGET_FILE
+
+
+# 页面各部分，用于超出预算时给出分项明细
+SECTIONS = {
+    "style": re.compile(r"<style[^>]*>.*?</style>", re.DOTALL),
+    "script": re.compile(r"<script[^>]*>.*?</script>", re.DOTALL),
+    "heatmap": re.compile(r'<section class="heatmap-section">.*?</section>', re.DOTALL),
+}
+
+
+METRICS = (
+    "bytes",
+    "gzip_bytes",
+    "elements",
+    "inline_script_bytes",
+    "inline_style_bytes",
+    "heatmap_cells",
+)
+
+
+class BudgetExceededError(Exception):
+    """Raised when a generated page is over its budget"""
+
+
+class BudgetConfigError(Exception):
+    """Raised when the budget file cannot be read or names unknown metrics"""
+
+
+class _PageParser(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.elements = 0
+        self.heatmap_cells = 0
+        self.inline_script_bytes = 0
+        self.inline_style_bytes = 0
+        self._inline = None
+
+    def handle_starttag(self, tag, attrs):
+        self.elements += 1
+        attrs = dict(attrs)
+        if "day-cell" in (attrs.get("class") or "").split():
+            self.heatmap_cells += 1
+        if attrs.get("style"):
+            self.inline_style_bytes += len(attrs["style"].encode("utf-8"))
+        if tag == "style" or (tag == "script" and not attrs.get("src")):
+            self._inline = tag
+
+    def handle_endtag(self, tag):
+        if tag == self._inline:
+            self._inline = None
+
+    def handle_data(self, data):
+        if self._inline == "script":
+            self.inline_script_bytes += len(data.encode("utf-8"))
+        elif self._inline == "style":
+            self.inline_style_bytes += len(data.encode("utf-8"))
+
+
+def measure_page(path):
+    """Measure size, DOM and inline asset metrics of an HTML file"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    html = raw.decode("utf-8")
+
+    parser = _PageParser()
+    parser.feed(html)
+    parser.close()
+
+    sections = {}
+    rest = len(raw)
+    for name, pattern in SECTIONS.items():
+        size = sum(len(m.group(0).encode("utf-8")) for m in pattern.finditer(html))
+        sections[name] = size
+        rest -= size
+    sections["other"] = rest
+
+    return {
+        "bytes": len(raw),
+        "gzip_bytes": len(gzip.compress(raw, compresslevel=9)),
+        "elements": parser.elements,
+        "inline_script_bytes": parser.inline_script_bytes,
+        "inline_style_bytes": parser.inline_style_bytes,
+        "heatmap_cells": parser.heatmap_cells,
+        "sections": sections,
+    }
+
+
+def load_budget(path=PAGE_BUDGET_FILE):
+    """Load the budget file: a {metric: limit} mapping"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise BudgetConfigError(f"Cannot read budget file {path}: {e}")
+
+
+def format_report(path, metrics, budget):
+    """Per-metric and per-section breakdown of a page"""
+    lines = [f"📏 Page budget for {path}:"]
+    for key, limit in budget.items():
+        value = metrics.get(key)
+        if value is None:
+            continue
+        status = "❌" if value > limit else "✅"
+        lines.append(f"  {status} {key:<20} {value:>8} / {limit}")
+    lines.append("  Sections (bytes):")
+    for name, size in metrics["sections"].items():
+        lines.append(f"     {name:<20} {size:>8} ({size * 100 // max(metrics['bytes'], 1)}%)")
+    return "\n".join(lines)
+
+
+def check_page_budget(paths, budget_file=PAGE_BUDGET_FILE):
+    """
+    Measure every page and compare it with the budget.
+
+    Prints a report per page and raises BudgetExceededError naming the
+    metrics that are over their limit.
+    """
+    budget = load_budget(budget_file)
+    unknown = [key for key in budget if key not in METRICS]
+    if unknown:
+        raise BudgetConfigError(f"Unknown budget metrics in {budget_file}: {', '.join(unknown)}")
+
+    failures = []
+    for path in paths:
+        metrics = measure_page(path)
+        print(format_report(path, metrics, budget))
+        failures += [
+            f"{os.path.basename(path)}: {key} {metrics[key]} > {limit}"
+            for key, limit in budget.items()
+            if metrics[key] > limit
+        ]
+
+    if failures:
+        raise BudgetExceededError("Page budget exceeded:\n  " + "\n  ".join(failures))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check generated pages against the page budget")
+    parser.add_argument("pages", nargs="*", default=["index.html"], help="HTML files to check")
+    parser.add_argument("--budget", default=PAGE_BUDGET_FILE, help="Budget JSON file")
+    args = parser.parse_args()
+
+    try:
+        return check_page_budget(args.pages, args.budget)
+    except (BudgetExceededError, BudgetConfigError) as e:
+        print(f"❌ {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
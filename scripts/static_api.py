@@ -0,0 +1,106 @@
+"""Static JSON API with content-hashed per-year shards"""
+
+import hashlib
+import json
+import os
+
+from config import API_DIR
+
+
+API_VERSION = 1
+
+
+def _dump(data):
+    """Deterministic compact JSON, so unchanged content keeps its hash"""
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _write_hashed(directory, stem, data):
+    """
+    Write data to <stem>.<hash>.json and return the file name.
+
+    Existing files are left untouched: a hashed name always has the same content.
+    """
+    content = _dump(data)
+    name = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}.json"
+    path = os.path.join(directory, name)
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.write(content)
+    return name
+
+
+def _manifest_files(manifest):
+    """Hashed file names referenced by a manifest: (year shards, summary)"""
+    if not manifest:
+        return set(), set()
+    shards = {os.path.basename(s["path"]) for s in manifest.get("years", {}).values()}
+    return shards, {manifest.get("summary")}
+
+
+def _load_manifest(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _remove_stale(directory, keep):
+    """Delete hashed files referenced by neither the current nor the previous manifest"""
+    for name in os.listdir(directory):
+        if name.endswith(".json") and name.count(".") == 2 and name not in keep:
+            os.remove(os.path.join(directory, name))
+
+
+def build_static_api(reading_data, stats, out_dir=API_DIR):
+    """
+    Emit api/v1/: per-year shards, a summary and a manifest.
+
+    Shards and the summary are named by content hash and can be cached forever
+    (Cache-Control: immutable). Only manifest.json keeps a fixed name, so clients
+    refetch it and then just the shards whose names changed. Files of the previous
+    generation are kept for one more run, so clients holding the old manifest
+    can still fetch what it references.
+    """
+    reading_days = reading_data.get("reading_days", {})
+    root = os.path.join(out_dir, f"v{API_VERSION}")
+    years_dir = os.path.join(root, "years")
+    os.makedirs(years_dir, exist_ok=True)
+
+    by_year = {}
+    for day in sorted(reading_days):
+        by_year.setdefault(day[:4], []).append(day)
+
+    shards = {}
+    for year, days in by_year.items():
+        name = _write_hashed(years_dir, year, {"year": int(year), "days": days})
+        shards[year] = {"path": f"years/{name}", "days": len(days)}
+
+    summary = {
+        "stats": stats,
+        "first_day": min(reading_days) if reading_days else None,
+        "last_day": max(reading_days) if reading_days else None,
+        "last_updated": reading_data.get("last_updated", ""),
+        "years": {year: len(days) for year, days in by_year.items()},
+    }
+    summary_name = _write_hashed(root, "summary", summary)
+
+    # 时间戳取自数据本身，数据不变时 manifest.json 也不变
+    manifest = {
+        "version": API_VERSION,
+        "generated": summary["last_updated"],
+        "summary": summary_name,
+        "years": shards,
+    }
+    manifest_path = os.path.join(root, "manifest.json")
+    previous_shards, previous_summary = _manifest_files(_load_manifest(manifest_path))
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    current_shards, current_summary = _manifest_files(manifest)
+    _remove_stale(years_dir, current_shards | previous_shards)
+    _remove_stale(root, current_summary | previous_summary)
+
+    print(f"✅ Static API written to {root} ({len(shards)} year shards)")
+    return manifest
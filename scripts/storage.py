@@ -0,0 +1,91 @@
+"""Compact storage of the raw Kindle payload"""
+
+import argparse
+import gzip
+import json
+import os
+
+from config import KINDLE_DATA_FILE, KINDLE_RAW_ARCHIVE
+
+
+# 流水线实际读取的字段（parse_reading_days 及其备用方法），其余字段不落盘
+PIPELINE_FIELDS = {
+    "days_read": True,
+    "current_daily_streak": {"start": True, "duration": True},
+    "current_weekly_streak": {"start": True, "end": True, "duration": True},
+    "goal_info": {"titles_read": {"date_read": True}},
+}
+
+
+def project(value, spec):
+    """Keep only the fields named in spec; lists are projected item by item"""
+    if spec is True:
+        return value
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+
+
+def project_payload(data):
+    """Project a Kindle payload, including per-marketplace payloads"""
+    projected = project(data, PIPELINE_FIELDS)
+    if "marketplace_data" in data:
+        projected["marketplace_data"] = {
+            host: project(payload, PIPELINE_FIELDS)
+            for host, payload in data["marketplace_data"].items()
+        }
+    return projected
+
+
+def save_compact_json(path, data):
+    """Write JSON without indentation or spaces"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def archive_raw_payload(data, path=KINDLE_RAW_ARCHIVE):
+    """Write the full payload to a gzip archive"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    return path
+
+
+def load_raw_archive(path=KINDLE_RAW_ARCHIVE):
+    """Read back a payload written by archive_raw_payload"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def reproject_archive(archive=KINDLE_RAW_ARCHIVE, output=KINDLE_DATA_FILE):
+    """
+    Rebuild the compact Kindle data file from the raw archive.
+
+    Used after PIPELINE_FIELDS changes, so the new fields are available
+    without another sync.
+    """
+    projected = project_payload(load_raw_archive(archive))
+    save_compact_json(output, projected)
+    return projected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild kindle_data.json from the raw Kindle archive")
+    parser.add_argument("--archive", default=KINDLE_RAW_ARCHIVE, help="Archive written by kindle_sync.py --archive-raw")
+    parser.add_argument("--output", default=KINDLE_DATA_FILE, help="Compact Kindle data file to write")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.archive):
+        print(f"Error: archive not found: {args.archive}")
+        return False
+
+    reproject_archive(args.archive, args.output)
+    print(f"✅ Re-projected {args.archive} into {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
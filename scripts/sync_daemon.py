@@ -0,0 +1,204 @@
+"""Long-running Kindle sync for many accounts"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import random
+import threading
+import time
+
+from config import (
+    DAEMON_ACCOUNTS_FILE,
+    DAEMON_REQUEST_RATE,
+    DAEMON_REQUEST_BURST,
+    DAEMON_BASE_INTERVAL,
+    DAEMON_MAX_INTERVAL,
+    DAEMON_RETRY_DELAY,
+    USERS_DIR,
+    ACCOUNTS_DATA_DIR,
+    SESSIONS_DIR,
+)
+from kindle_sync import KindleSync
+
+
+class TokenBucket:
+    """Global request rate limit shared by every account"""
+
+    def __init__(self, rate=DAEMON_REQUEST_RATE, capacity=DAEMON_REQUEST_BURST,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        with self.lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.sleep((1 - self.tokens) / self.rate)
+
+
+class Account:
+    """One Kindle account and its scheduling state"""
+
+    def __init__(self, name, cookie, marketplaces=None, interval=DAEMON_BASE_INTERVAL):
+        self.name = name
+        self.cookie = cookie
+        self.marketplaces = marketplaces
+        self.interval = interval
+        self.failures = 0
+        self.fingerprint = None
+
+    def make_syncer(self, rate_limiter):
+        return KindleSync(
+            self.cookie,
+            marketplaces=self.marketplaces,
+            session_file=os.path.join(SESSIONS_DIR, f"{self.name}.json"),
+            kindle_data_file=os.path.join(ACCOUNTS_DATA_DIR, f"{self.name}.json"),
+            reading_data_file=os.path.join(USERS_DIR, f"{self.name}.json"),
+            rate_limiter=rate_limiter,
+        )
+
+
+def load_accounts(path=DAEMON_ACCOUNTS_FILE):
+    """
+    Load accounts from a JSON list of {"name", "cookie" or "cookie_env", "marketplaces"}.
+
+    cookie_env names an environment variable so cookies stay out of the file;
+    cookie may also be a {base_url: cookie} mapping for per-marketplace logins.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+
+    accounts = []
+    for entry in entries:
+        cookie = entry.get("cookie") or os.environ.get(entry.get("cookie_env", ""), "")
+        if not cookie:
+            print(f"⚠️  No cookie for account {entry['name']}, skipping")
+            continue
+        accounts.append(Account(entry["name"], cookie, entry.get("marketplaces")))
+    return accounts
+
+
+class SyncScheduler:
+    """
+    Priority queue of accounts keyed by next-due time.
+
+    Accounts whose data did not change are polled less often (up to
+    max_interval); failed accounts are retried with exponential backoff
+    and jitter so they don't all hit Amazon at the same moment. Accounts
+    whose login expired are parked until the daemon is restarted with a
+    new cookie, since retrying cannot fix them.
+    """
+
+    def __init__(self, accounts, rate_limiter=None, base_interval=DAEMON_BASE_INTERVAL,
+                 max_interval=DAEMON_MAX_INTERVAL, retry_delay=DAEMON_RETRY_DELAY,
+                 clock=time.time, sleep=time.sleep):
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.retry_delay = retry_delay
+        self.clock = clock
+        self.sleep = sleep
+        self.queue = []
+        self.seq = 0
+        self.parked = []
+
+        # 启动时错开各账号的首次同步
+        now = clock()
+        for account in accounts:
+            self.schedule(account, now + random.uniform(0, min(60, base_interval)))
+
+    def schedule(self, account, due):
+        heapq.heappush(self.queue, (due, self.seq, account))
+        self.seq += 1
+
+    def next_delay(self, account, ok, changed):
+        """Seconds until the account is due again"""
+        if not ok:
+            account.failures += 1
+            delay = self.retry_delay * 2 ** (account.failures - 1) * random.uniform(0.5, 1.5)
+            return min(delay, self.max_interval)
+
+        account.failures = 0
+        if changed:
+            account.interval = self.base_interval
+        else:
+            account.interval = min(account.interval * 2, self.max_interval)
+        return account.interval
+
+    def run_once(self):
+        """Wait for the next due account and sync it"""
+        due, _, account = heapq.heappop(self.queue)
+        wait = due - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+
+        print(f"\n🔄 Syncing account {account.name}...")
+        syncer = account.make_syncer(self.rate_limiter)
+        ok = syncer.sync()
+
+        if syncer.login_expired:
+            self.parked.append(account)
+            print(f"🅿️  {account.name}: login expired, parked until its cookie is updated")
+            return ok
+
+        changed = False
+        if ok:
+            fingerprint = hashlib.sha256(json.dumps(sorted(syncer.reading_dict)).encode("utf-8")).hexdigest()
+            changed = fingerprint != account.fingerprint
+            account.fingerprint = fingerprint
+
+        delay = self.next_delay(account, ok, changed)
+        status = "changed" if changed else ("unchanged" if ok else f"failed x{account.failures}")
+        print(f"⏱  {account.name}: {status}, next sync in {delay / 60:.0f} min")
+        self.schedule(account, self.clock() + delay)
+        return ok
+
+    def run_forever(self):
+        while self.queue:
+            self.run_once()
+        if self.parked:
+            print(f"⚠️  No accounts left to sync; parked: {', '.join(a.name for a in self.parked)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep many Kindle accounts in sync")
+    parser.add_argument("--accounts", default=DAEMON_ACCOUNTS_FILE, help="Accounts JSON file")
+    parser.add_argument("--rate", type=float, default=DAEMON_REQUEST_RATE, help="Requests per second to Amazon")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.accounts):
+        print(f"Error: accounts file not found: {args.accounts}")
+        return False
+
+    accounts = load_accounts(args.accounts)
+    if not accounts:
+        print("Error: no accounts to sync")
+        return False
+
+    print(f"🚀 Syncing {len(accounts)} accounts, at most {args.rate} requests/s")
+    scheduler = SyncScheduler(accounts, TokenBucket(rate=args.rate))
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+        return True
+    # 队列清空只可能是所有账号都已停放
+    return False
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,290 @@
+"""Generate a combined reading page for a group of readers"""
+
+import argparse
+import base64
+import html
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from config import USERS_DIR, TEAM_PAGE_FILE, TEAM_LEADERBOARD_SIZE
+
+
+HEATMAP_WEEKS = 53
+
+
+def load_user_matrix(users_dir=USERS_DIR, today=None):
+    """
+    Load every <name>.json reading history in users_dir into a users x days matrix.
+
+    Returns (names, start_date, matrix) where matrix[u, d] is True if user u read
+    on start_date + d. The last column is always today.
+    """
+    today = (today or datetime.now()).date()
+    names = []
+    histories = []
+
+    for filename in sorted(os.listdir(users_dir)):
+        if not filename.endswith(".json"):
+            continue
+        with open(os.path.join(users_dir, filename), "r", encoding="utf-8") as f:
+            reading_days = json.load(f).get("reading_days", {})
+        names.append(filename[:-len(".json")])
+        histories.append(np.array(sorted(reading_days), dtype="datetime64[D]"))
+
+    # 至少覆盖热力图的完整窗口（从 53 周前的周一开始）
+    window_start = today - timedelta(days=(HEATMAP_WEEKS - 1) * 7 + today.weekday())
+    start = np.datetime64(window_start, "D")
+    for days in histories:
+        if days.size:
+            start = min(start, days.min())
+    end = np.datetime64(today, "D")
+
+    matrix = np.zeros((len(names), int((end - start).astype(int)) + 1), dtype=bool)
+    for row, days in enumerate(histories):
+        days = days[days <= end]
+        matrix[row, (days - start).astype(int)] = True
+
+    return names, start.astype(object), matrix
+
+
+def streak_lengths(matrix):
+    """Length of the reading streak ending at each cell (0 where not read)"""
+    counts = matrix.cumsum(axis=1)
+    resets = np.maximum.accumulate(np.where(matrix, 0, counts), axis=1)
+    return counts - resets
+
+
+def calculate_group_stats(names, start_date, matrix):
+    """Calculate per-member and group statistics with whole-matrix operations"""
+    today = start_date + timedelta(days=matrix.shape[1] - 1)
+    year_offset = max((datetime(today.year, 1, 1).date() - start_date).days, 0)
+    month_offset = max((today.replace(day=1) - start_date).days, 0)
+
+    runs = streak_lengths(matrix)
+    read_today = matrix[:, -1]
+    # 与单人页面一致：今天或昨天读过都算连续
+    if matrix.shape[1] > 1:
+        current_streak = np.where(read_today, runs[:, -1], runs[:, -2])
+    else:
+        current_streak = runs[:, -1]
+
+    members = {
+        "names": names,
+        "total_days": matrix.sum(axis=1),
+        "this_year_days": matrix[:, year_offset:].sum(axis=1),
+        "this_month_days": matrix[:, month_offset:].sum(axis=1),
+        "current_streak": current_streak,
+        "longest_streak": runs.max(axis=1, initial=0),
+        "read_today": read_today,
+    }
+
+    readers_per_day = matrix.sum(axis=0)
+    group = {
+        "members": len(names),
+        "total_days": int(members["total_days"].sum()),
+        "this_year_days": int(members["this_year_days"].sum()),
+        "this_month_days": int(members["this_month_days"].sum()),
+        "readers_today": int(read_today.sum()),
+        "active_days": int(np.count_nonzero(readers_per_day)),
+        "best_day_readers": int(readers_per_day.max(initial=0)),
+    }
+
+    return {"today": today, "members": members, "group": group, "readers_per_day": readers_per_day}
+
+
+def leaderboard(stats, key, size=TEAM_LEADERBOARD_SIZE):
+    """Top members by a stat, as (name, value) pairs"""
+    values = stats["members"][key]
+    order = np.argsort(-values, kind="stable")[:size]
+    return [(stats["members"]["names"][i], int(values[i])) for i in order if values[i] > 0]
+
+
+def heatmap_window(start_date, row, today):
+    """Slice the last 53 weeks of a day vector, padded to whole weeks"""
+    window_start = today - timedelta(days=(HEATMAP_WEEKS - 1) * 7 + today.weekday())
+    offset = (window_start - start_date).days
+    window = np.zeros(HEATMAP_WEEKS * 7, dtype=row.dtype)
+    data = row[offset:]
+    window[:data.size] = data
+    return window
+
+
+def encode_bits(window):
+    """Bit-pack a boolean day window for the page script"""
+    return base64.b64encode(np.packbits(window.astype(bool)).tobytes()).decode("ascii")
+
+
+def encode_levels(window):
+    """Scale reader counts to 0-4 levels, one character per day"""
+    peak = max(int(window.max(initial=0)), 1)
+    levels = np.ceil(window * 4 / peak).astype(int)
+    return "".join(map(str, levels))
+
+
+def generate_team_html(names, start_date, matrix, output_file=TEAM_PAGE_FILE):
+    """Generate the combined team page"""
+    stats = calculate_group_stats(names, start_date, matrix)
+    today = stats["today"]
+    members = stats["members"]
+    group = stats["group"]
+    future_from = (HEATMAP_WEEKS - 1) * 7 + today.weekday() + 1
+
+    group_levels = encode_levels(heatmap_window(start_date, stats["readers_per_day"], today))
+
+    member_rows = ""
+    for i, name in enumerate(names):
+        bits = encode_bits(heatmap_window(start_date, matrix[i], today))
+        member_rows += (
+            f'<tr><td class="name">{"● " if members["read_today"][i] else ""}{html.escape(name)}</td>'
+            f'<td>{members["total_days"][i]}</td><td>{members["this_year_days"][i]}</td>'
+            f'<td>{members["this_month_days"][i]}</td>'
+            f'<td>{members["current_streak"][i]}</td><td>{members["longest_streak"][i]}</td>'
+            f'<td><canvas class="strip" data-bits="{bits}"></canvas></td></tr>\n'
+        )
+
+    boards_html = ""
+    for key, title in [("total_days", "Total Days"), ("current_streak", "Current Streak"),
+                       ("longest_streak", "Longest Streak")]:
+        items = "".join(
+            f"<li>{html.escape(name)}<span>{value}</span></li>" for name, value in leaderboard(stats, key)
+        )
+        boards_html += f'<div class="board"><h3>{title}</h3><ol>{items}</ol></div>\n'
+
+    readers_today = [html.escape(n) for n, r in zip(names, members["read_today"]) if r]
+
+    page = f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>团队阅读记录</title>
+    <style>
+        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
+        :root {{
+            --bg-primary: #f4f1ea;
+            --bg-secondary: #ffffff;
+            --text-primary: #1a1a1a;
+            --text-secondary: #666666;
+            --text-tertiary: #999999;
+            --border-color: #d4d4d4;
+        }}
+        body {{
+            font-family: 'Georgia', 'Times New Roman', 'STSong', 'SimSun', serif;
+            background: var(--bg-primary);
+            color: var(--text-primary);
+            padding: 2rem 1rem;
+        }}
+        .container {{ max-width: 1100px; margin: 0 auto; background: var(--bg-secondary); padding: 3rem; }}
+        h1 {{ text-align: center; font-weight: 500; letter-spacing: 2px; margin-bottom: 2rem; }}
+        h2 {{ font-weight: 400; margin: 2.5rem 0 1rem; }}
+        .stats {{ display: grid; grid-template-columns: repeat(4, 1fr); gap: 1rem; }}
+        .stat-item {{ border: 1px solid var(--border-color); padding: 1.2rem; text-align: center; }}
+        .stat-label {{ font-size: 0.7rem; letter-spacing: 1.5px; text-transform: uppercase; font-family: 'Helvetica Neue', 'Arial', sans-serif; }}
+        .stat-value {{ font-size: 2.2rem; font-weight: 300; font-family: 'Helvetica Neue', 'Arial', sans-serif; }}
+        .boards {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; }}
+        .board {{ border: 1px solid var(--border-color); padding: 1rem 1.5rem; }}
+        .board h3 {{ font-size: 0.8rem; letter-spacing: 1.5px; text-transform: uppercase; margin-bottom: 0.5rem; }}
+        .board li {{ display: flex; justify-content: space-between; line-height: 1.8; }}
+        .today {{ color: var(--text-secondary); line-height: 1.8; }}
+        table {{ width: 100%; border-collapse: collapse; font-size: 0.9rem; }}
+        th, td {{ text-align: right; padding: 4px 8px; border-bottom: 1px solid var(--border-color); white-space: nowrap; }}
+        th.name, td.name {{ text-align: left; }}
+        canvas {{ display: block; }}
+        .table-wrapper {{ overflow-x: auto; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>团队阅读记录</h1>
+
+        <div class="stats">
+            <div class="stat-item"><div class="stat-label">Members</div><div class="stat-value">{group['members']}</div></div>
+            <div class="stat-item"><div class="stat-label">Read Today</div><div class="stat-value">{group['readers_today']}</div></div>
+            <div class="stat-item"><div class="stat-label">This Month</div><div class="stat-value">{group['this_month_days']}</div></div>
+            <div class="stat-item"><div class="stat-label">Total Days</div><div class="stat-value">{group['total_days']}</div></div>
+        </div>
+
+        <h2>今日阅读</h2>
+        <p class="today">{'、'.join(readers_today) if readers_today else '今天还没有人阅读'}</p>
+
+        <h2>团队阅读活动</h2>
+        <canvas id="groupHeatmap" data-levels="{group_levels}"></canvas>
+
+        <h2>排行榜</h2>
+        <div class="boards">
+{boards_html}        </div>
+
+        <h2>成员</h2>
+        <div class="table-wrapper">
+        <table>
+            <tr><th class="name">Name</th><th>Total</th><th>Year</th><th>Month</th><th>Streak</th><th>Longest</th><th class="name">Past Year</th></tr>
+{member_rows}        </table>
+        </div>
+
+        <p class="today" style="margin-top: 2rem; text-align: center;">Last updated: {today.strftime('%Y-%m-%d')}</p>
+    </div>
+
+    <script>
+        // 所有热力图都在 canvas 上绘制，按列（周）从上到下
+        var FUTURE_FROM = {future_from};
+        var COLORS = ["#f4f1ea", "#bdbdbd", "#8a8a8a", "#4d4d4d", "#1a1a1a"];
+
+        function drawCells(canvas, cellSize, levelAt) {{
+            var weeks = {HEATMAP_WEEKS};
+            canvas.width = weeks * cellSize;
+            canvas.height = 7 * cellSize;
+            var ctx = canvas.getContext("2d");
+            for (var i = 0; i < FUTURE_FROM; i++) {{
+                ctx.fillStyle = COLORS[levelAt(i)];
+                ctx.fillRect(Math.floor(i / 7) * cellSize, (i % 7) * cellSize, cellSize - 1, cellSize - 1);
+            }}
+        }}
+
+        var group = document.getElementById("groupHeatmap");
+        var levels = group.getAttribute("data-levels");
+        drawCells(group, 14, function(i) {{ return +levels[i]; }});
+
+        document.querySelectorAll("canvas.strip").forEach(function(canvas) {{
+            var bytes = atob(canvas.getAttribute("data-bits"));
+            drawCells(canvas, 4, function(i) {{
+                return (bytes.charCodeAt(i >> 3) >> (7 - (i & 7))) & 1 ? 4 : 0;
+            }});
+        }});
+    </script>
+</body>
+</html>"""
+
+    with open(output_file, "w", encoding="utf-8") as f:
+        f.write(page)
+
+    print(f"✅ Team page generated: {output_file}")
+    print(f"📊 Group stats: {group}")
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Generate a combined team reading page")
+    parser.add_argument("--users-dir", default=USERS_DIR, help="Directory of <name>.json reading histories")
+    parser.add_argument("--output", default=TEAM_PAGE_FILE, help="Output HTML file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.users_dir):
+        print(f"Error: users directory not found: {args.users_dir}")
+        return False
+
+    names, start_date, matrix = load_user_matrix(args.users_dir)
+    if not names:
+        print(f"Error: no reading histories found in {args.users_dir}")
+        return False
+
+    print(f"📖 Loaded {len(names)} members x {matrix.shape[1]} days")
+    generate_team_html(names, start_date, matrix, args.output)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    exit(0 if success else 1)
@@ -0,0 +1,96 @@
+"""Build-time daily calendar cache against a local stand-in image server"""
+
+import functools
+import io
+import os
+import sys
+import threading
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import gen_page  # noqa: E402
+
+
+DAY = datetime(2026, 3, 7)
+
+
+@pytest.fixture
+def stand_in(tmp_path):
+    """Serve tmp_path/www over HTTP and yield (www_dir, base_url)"""
+    www = tmp_path / "www"
+    www.mkdir()
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(www))
+    handler.log_message = lambda *args: None
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield www, f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fallback_url_is_fetched_resized_and_hashed(stand_in, tmp_path):
+    www, base_url = stand_in
+    # 只提供第二种 URL 格式，第一种返回 404
+    Image.new("RGB", (1600, 2400), (200, 10, 10)).save(www / "2026-3-7.jpg")
+
+    cache_dir = tmp_path / "cache"
+    path = gen_page.cache_daily_calendar(DAY, base_url=base_url, cache_dir=cache_dir, max_width=680)
+
+    assert path is not None
+    name = os.path.basename(path)
+    assert name.startswith("calendar-2026-03-07-") and name.endswith(".jpg")
+    with open(path, "rb") as f:
+        assert Image.open(io.BytesIO(f.read())).size == (680, 1020)
+
+
+def test_stale_images_are_removed(stand_in, tmp_path):
+    www, base_url = stand_in
+    Image.new("RGB", (100, 100)).save(www / "2026-3-7.jpg")
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "calendar-2026-03-06-0000000000.jpg").write_bytes(b"old")
+
+    path = gen_page.cache_daily_calendar(DAY, base_url=base_url, cache_dir=cache_dir)
+
+    assert os.listdir(cache_dir) == [os.path.basename(path)]
+
+
+def test_non_image_response_falls_back_to_browser(stand_in, tmp_path):
+    www, base_url = stand_in
+    (www / "2026").mkdir()
+    (www / "2026" / "37.jpg").write_text("<html>error page</html>")
+
+    assert gen_page.cache_daily_calendar(DAY, base_url=base_url, cache_dir=tmp_path / "cache") is None
+
+
+def test_missing_image_falls_back_to_browser(stand_in, tmp_path):
+    _, base_url = stand_in
+    assert gen_page.cache_daily_calendar(DAY, base_url=base_url, cache_dir=tmp_path / "cache") is None
+
+
+def test_cached_image_is_referenced_directly(tmp_path):
+    image = tmp_path / "data" / "calendar" / "calendar-2026-03-07-abc.jpg"
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"jpg")
+    output = tmp_path / "index.html"
+
+    gen_page.generate_html({"reading_days": {}}, output_file=str(output), calendar_image=str(image))
+
+    html = output.read_text(encoding="utf-8")
+    assert 'src="data/calendar/calendar-2026-03-07-abc.jpg"' in html
+    assert "var CALENDAR_CACHED = true;" in html
+
+
+def test_base_url_is_escaped_in_script(tmp_path, monkeypatch):
+    monkeypatch.setattr(gen_page, "DAILY_CALENDAR_BASE_URL", 'https://example.com/a"b')
+    output = tmp_path / "index.html"
+
+    gen_page.generate_html({"reading_days": {}}, output_file=str(output))
+
+    assert 'var CALENDAR_BASE_URL = "https://example.com/a\\"b";' in output.read_text(encoding="utf-8")
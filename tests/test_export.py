@@ -0,0 +1,80 @@
+"""Streaming export of reading days"""
+
+import io
+import json
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import export  # noqa: E402
+
+
+DAYS = ["2025-12-30", "2025-12-31", "2026-01-01", "2026-01-03", "2026-01-04", "2026-02-10"]
+
+
+def write_data(path, reading_days, indent=2):
+    data = {
+        "last_updated": "2026-02-10 08:00:00",
+        "sources": {"1999-01-01": ["www.amazon.com"]},
+        "reading_days": {day: 1 for day in reading_days},
+        "total_days": len(reading_days),
+    }
+    path.write_text(json.dumps(data, indent=indent), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 13, 64 * 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_chunk_boundaries_match_json_load(tmp_path, monkeypatch, chunk_size, indent):
+    monkeypatch.setattr(export, "CHUNK_SIZE", chunk_size)
+    path = write_data(tmp_path / "reading_data.json", DAYS, indent)
+
+    days = [(d.isoformat(), v) for d, v in export.iter_reading_days(path)]
+
+    assert days == list(json.loads(path.read_text(encoding="utf-8"))["reading_days"].items())
+
+
+def test_since_skips_earlier_days(tmp_path):
+    path = write_data(tmp_path / "reading_data.json", DAYS)
+    days = [d.isoformat() for d, _ in export.iter_reading_days(path, since=date(2026, 1, 3))]
+    assert days == ["2026-01-04", "2026-02-10"]
+
+
+def test_out_of_order_days_are_rejected(tmp_path):
+    path = write_data(tmp_path / "reading_data.json", ["2026-01-02", "2026-01-01"])
+    with pytest.raises(ValueError, match="not in date order"):
+        list(export.iter_reading_days(path))
+
+
+def test_ics_merges_streaks(tmp_path):
+    path = write_data(tmp_path / "reading_data.json", DAYS)
+    out = io.StringIO()
+
+    count = export.write_ics(export.iter_reading_days(path), out)
+
+    ics = out.getvalue()
+    assert count == 3
+    assert "DTSTART;VALUE=DATE:20251230\r\nDTEND;VALUE=DATE:20260102\r\n" in ics
+    assert "SUMMARY:📚 Reading streak (3 days)" in ics
+    assert "DTSTART;VALUE=DATE:20260210\r\nDTEND;VALUE=DATE:20260211\r\n" in ics
+
+
+def test_append_writes_header_once(tmp_path, monkeypatch):
+    data = write_data(tmp_path / "reading_data.json", DAYS)
+    output = tmp_path / "days.csv"
+
+    for since in (None, "2026-01-03"):
+        argv = ["export.py", "csv", "--input", str(data), "-o", str(output), "--append"]
+        if since:
+            argv += ["--since", since]
+        monkeypatch.setattr(sys, "argv", argv)
+        assert export.main()
+
+    lines = output.read_text(encoding="utf-8").splitlines()
+    assert lines[0] == "date,value"
+    assert lines.count("date,value") == 1
+    assert len(lines) == 1 + len(DAYS) + 2
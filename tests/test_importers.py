@@ -0,0 +1,63 @@
+"""Local reader imports and their survival across Kindle syncs"""
+
+import json
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from importers import KOReaderImporter, import_reading_days  # noqa: E402
+from kindle_sync import KindleSync  # noqa: E402
+
+
+def koreader_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE page_stat_data (start_time INTEGER, duration INTEGER)")
+    conn.executemany("INSERT INTO page_stat_data VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_standalone_import_records_sources(tmp_path):
+    # 2023-11-14 读了 100 秒，2023-11-15 只有 10 秒（低于阈值）
+    db = koreader_db(tmp_path / "statistics.sqlite3", [(1699963200, 100), (1700049600, 10)])
+    data_file = tmp_path / "reading_data.json"
+    data_file.write_text(json.dumps({"reading_days": {"2025-01-01": 1}, "total_days": 1}), encoding="utf-8")
+
+    import_reading_days([KOReaderImporter(db, min_seconds=60)], str(data_file))
+
+    data = json.loads(data_file.read_text(encoding="utf-8"))
+    assert list(data["reading_days"]) == ["2023-11-14", "2025-01-01"]
+    assert data["total_days"] == 2
+    assert data["sources"] == {"2023-11-14": ["koreader"]}
+
+
+def test_kindle_sync_keeps_imported_days(tmp_path):
+    data_file = tmp_path / "reading_data.json"
+    data_file.write_text(json.dumps({
+        "reading_days": {"2023-11-14": 1, "2024-01-01": 1, "2025-01-01": 1},
+        "sources": {"2023-11-14": ["koreader"], "2024-01-01": ["www.amazon.com", "calibre"]},
+    }), encoding="utf-8")
+    syncer = KindleSync("session-id=1", marketplaces=["https://www.amazon.com"], session_file=None,
+                        reading_data_file=str(data_file))
+
+    reading_dict, sources = syncer.carry_forward({"2026-01-01": 1}, {"2026-01-01": ["www.amazon.com"]}, set())
+
+    assert list(reading_dict) == ["2023-11-14", "2024-01-01", "2026-01-01"]
+    assert sources == {
+        "2023-11-14": ["koreader"],
+        "2024-01-01": ["calibre"],
+        "2026-01-01": ["www.amazon.com"],
+    }
+
+
+def test_reimported_source_is_not_carried(tmp_path):
+    data_file = tmp_path / "reading_data.json"
+    data_file.write_text(json.dumps({"sources": {"2023-11-14": ["koreader"]}}), encoding="utf-8")
+    syncer = KindleSync("session-id=1", session_file=None, reading_data_file=str(data_file))
+
+    reading_dict, _ = syncer.carry_forward({}, {}, {"koreader"})
+
+    assert reading_dict == {}
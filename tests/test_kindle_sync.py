@@ -0,0 +1,84 @@
+"""Multi-marketplace Kindle sync against local stand-in Amazon servers"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from kindle_sync import KindleSync  # noqa: E402
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Insights page and data endpoint; days and failure mode set per server"""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.server.broken:
+            self.send_response(200 if not self.path.endswith("/data") else 500)
+            self.end_headers()
+            return
+        if self.path.endswith("/data"):
+            body = json.dumps({"days_read": self.server.days}).encode("utf-8")
+        else:
+            body = b"<html></html>"
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def marketplaces():
+    servers = []
+    for ip in ("127.0.0.1", "127.0.0.2"):
+        server = ThreadingHTTPServer((ip, 0), StandIn)
+        server.days, server.broken = [], False
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def host(server):
+    return "%s:%s" % server.server_address
+
+
+def test_failed_marketplace_keeps_its_previous_days(marketplaces, tmp_path):
+    com, cn = marketplaces
+    com.days = ["2026-01-01", "2026-01-02"]
+    cn.broken = True
+    data_file = tmp_path / "reading_data.json"
+    data_file.write_text(json.dumps({
+        "reading_days": {"2025-06-01": 1, "2025-06-02": 1, "2026-01-01": 1},
+        "sources": {
+            "2025-06-01": [host(cn)],
+            "2025-06-02": [host(com)],
+            "2026-01-01": [host(com), host(cn)],
+        },
+    }), encoding="utf-8")
+
+    syncer = KindleSync(
+        "session-id=1",
+        marketplaces=[f"http://{host(com)}", f"http://{host(cn)}"],
+        session_file=None,
+        kindle_data_file=str(tmp_path / "kindle_data.json"),
+        reading_data_file=str(data_file),
+    )
+    assert syncer.sync()
+
+    data = json.loads(data_file.read_text(encoding="utf-8"))
+    # cn 的历史保留，com 已不再返回的 2025-06-02 被移除
+    assert list(data["reading_days"]) == ["2025-06-01", "2026-01-01", "2026-01-02"]
+    assert data["sources"] == {
+        "2025-06-01": [host(cn)],
+        "2026-01-01": [host(com), host(cn)],
+        "2026-01-02": [host(com)],
+    }
@@ -0,0 +1,41 @@
+"""Page budget checks"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import page_budget  # noqa: E402
+
+
+@pytest.fixture
+def page(tmp_path):
+    path = tmp_path / "index.html"
+    path.write_text('<html><body><div class="day-cell"></div><script>var a = 1;</script></body></html>')
+    return str(path)
+
+
+def write_budget(tmp_path, budget):
+    path = tmp_path / "page_budget.json"
+    path.write_text(json.dumps(budget))
+    return str(path)
+
+
+def test_page_within_budget(tmp_path, page):
+    assert page_budget.check_page_budget([page], write_budget(tmp_path, {"heatmap_cells": 1}))
+
+
+def test_page_over_budget(tmp_path, page):
+    with pytest.raises(page_budget.BudgetExceededError, match="heatmap_cells 1 > 0"):
+        page_budget.check_page_budget([page], write_budget(tmp_path, {"heatmap_cells": 0}))
+
+
+def test_unknown_metric_is_reported(tmp_path, page, monkeypatch, capsys):
+    budget = write_budget(tmp_path, {"heatmap_cell": 1})
+    monkeypatch.setattr(sys, "argv", ["page_budget.py", page, "--budget", budget])
+
+    assert page_budget.main() is False
+    assert "❌ Unknown budget metrics" in capsys.readouterr().out
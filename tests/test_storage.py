@@ -0,0 +1,36 @@
+"""Compact Kindle payload storage and the raw archive"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import storage  # noqa: E402
+
+
+PAYLOAD = {
+    "days_read": ["2026-01-01", "2026-01-02"],
+    "current_daily_streak": {"start": "2026-01-01", "duration": 2, "unused": 1},
+    "goal_info": {"titles_read": [{"date_read": "2026-01-02T10:00:00Z", "title": "Book"}], "goal": 12},
+    "customer_name": "someone",
+}
+
+
+def test_archive_round_trip_and_reprojection(tmp_path, monkeypatch):
+    archive = str(tmp_path / "kindle_data.raw.json.gz")
+    output = tmp_path / "kindle_data.json"
+    storage.archive_raw_payload(PAYLOAD, archive)
+
+    assert storage.load_raw_archive(archive) == PAYLOAD
+
+    # 新增流水线字段后，从存档重新投影即可拿到，无需重新同步
+    monkeypatch.setitem(storage.PIPELINE_FIELDS, "customer_name", True)
+    storage.reproject_archive(archive, str(output))
+
+    assert json.loads(output.read_text(encoding="utf-8")) == {
+        "days_read": ["2026-01-01", "2026-01-02"],
+        "current_daily_streak": {"start": "2026-01-01", "duration": 2},
+        "goal_info": {"titles_read": [{"date_read": "2026-01-02T10:00:00Z"}]},
+        "customer_name": "someone",
+    }
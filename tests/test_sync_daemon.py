@@ -0,0 +1,121 @@
+"""Sync daemon rate limiting and scheduling, on a fake clock"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import sync_daemon  # noqa: E402
+from sync_daemon import Account, SyncScheduler, TokenBucket  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class StubSyncer:
+    def __init__(self, ok, days, login_expired=False):
+        self.ok = ok
+        self.reading_dict = dict.fromkeys(days, 1)
+        self.login_expired = login_expired
+
+    def sync(self):
+        return self.ok
+
+
+class StubAccount(Account):
+    """Account whose syncs return scripted results"""
+
+    def __init__(self, name, results):
+        super().__init__(name, "session-id=1")
+        self.results = list(results)
+
+    def make_syncer(self, rate_limiter):
+        return self.results.pop(0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def scheduler(accounts, clock, **kwargs):
+    return SyncScheduler(accounts, rate_limiter=TokenBucket(clock=clock, sleep=clock.sleep),
+                         clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_token_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(rate=0.5, capacity=2, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        bucket.acquire()
+
+    assert clock.slept == [pytest.approx(2.0)]
+
+
+def test_token_bucket_refills_over_time(clock):
+    bucket = TokenBucket(rate=1, capacity=2, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+    bucket.acquire()
+    clock.now += 10
+
+    bucket.acquire()
+    bucket.acquire()
+
+    assert clock.slept == []
+
+
+def test_retry_delay_never_exceeds_max_interval(clock, monkeypatch):
+    monkeypatch.setattr(sync_daemon.random, "uniform", lambda a, b: b)
+    s = scheduler([], clock, retry_delay=60, max_interval=3600)
+    account = Account("a", "c")
+
+    delays = [s.next_delay(account, ok=False, changed=False) for _ in range(10)]
+
+    assert delays[0] == 90
+    assert max(delays) == 3600
+
+
+def test_unchanged_accounts_back_off_and_changes_reset(clock):
+    s = scheduler([], clock, base_interval=100, max_interval=350)
+    account = Account("a", "c", interval=100)
+
+    delays = [s.next_delay(account, ok=True, changed=False) for _ in range(3)]
+    delays.append(s.next_delay(account, ok=True, changed=True))
+
+    assert delays == [200, 350, 350, 100]
+
+
+def test_accounts_are_synced_in_due_order(clock):
+    first = StubAccount("first", [StubSyncer(True, ["2026-01-01"])])
+    second = StubAccount("second", [StubSyncer(True, ["2026-01-01"])])
+    s = scheduler([], clock, base_interval=100)
+    s.schedule(second, clock() + 50)
+    s.schedule(first, clock() + 10)
+
+    s.run_once()
+    s.run_once()
+
+    assert clock.slept == [10, 40]
+    assert [account.name for _, _, account in sorted(s.queue)] == ["first", "second"]
+
+
+def test_expired_login_is_parked(clock):
+    account = StubAccount("gone", [StubSyncer(False, [], login_expired=True)])
+    s = scheduler([account], clock)
+
+    s.run_forever()
+
+    assert s.parked == [account]
+    assert s.queue == []
@@ -0,0 +1,51 @@
+"""The team page's vectorized stats must match the single-user page"""
+
+import json
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import gen_page  # noqa: E402
+import team_page  # noqa: E402
+
+
+TODAY = date(2026, 3, 7)
+KEYS = ("total_days", "this_year_days", "this_month_days", "current_streak", "longest_streak")
+
+
+def team_stats(tmp_path, reading_days):
+    users = tmp_path / "users"
+    users.mkdir()
+    (users / "me.json").write_text(json.dumps({"reading_days": reading_days}), encoding="utf-8")
+    names, start, matrix = team_page.load_user_matrix(str(users), today=datetime(2026, 3, 7, 12))
+    members = team_page.calculate_group_stats(names, start, matrix)["members"]
+    return {key: int(members[key][0]) for key in KEYS}
+
+
+def days(*offsets):
+    return {(TODAY - timedelta(days=k)).isoformat(): 1 for k in offsets}
+
+
+@pytest.mark.parametrize("reading_days", [
+    {},
+    days(0, 1, 2, 5, 6),           # 今天在读，之前有间断
+    days(1, 2, 5, 6, 7, 8),        # 昨天读过仍算连续
+    days(2, 3, 4),                 # 连续已中断
+    days(-1, -2, 0, 1, 40, 400),   # 未来日期、跨年、跨月
+])
+def test_team_stats_match_single_user_page(tmp_path, reading_days):
+    assert team_stats(tmp_path, reading_days) == gen_page.calculate_stats(reading_days, today=TODAY)
+
+
+def test_random_histories_match(tmp_path):
+    rng = random.Random(7)
+    for i in range(20):
+        reading_days = days(*[k for k in range(-3, 800) if rng.random() < 0.6])
+        case = tmp_path / str(i)
+        case.mkdir()
+        assert team_stats(case, reading_days) == gen_page.calculate_stats(reading_days, today=TODAY)